@@ -6,8 +6,8 @@ import asyncio
 import logging
 import signal
 
-from telegram import BotCommand
-from telegram.ext import Application, CallbackQueryHandler, CommandHandler
+from telegram import BotCommand, Update
+from telegram.ext import Application, CallbackQueryHandler, ChatMemberHandler, CommandHandler
 
 from src.container import ServiceContainer
 from src.core.config import config
@@ -132,6 +132,9 @@ class Bot:
             CallbackQueryHandler(moderation.handle_moderation_callback, pattern="^action_|^user_info_")
         )
 
+        # Смена ролей участников — держит кэш статусов AdminService актуальным
+        self.application.add_handler(ChatMemberHandler(moderation.handle_chat_member, ChatMemberHandler.CHAT_MEMBER))
+
         # Спам-хендлеры
         register_spam_handlers(self.application, spam_detector, ban_service, admin_service, dota_service)
 
@@ -160,7 +163,8 @@ class Bot:
         # Регистрируем команды в меню Telegram
         await self._set_commands()
 
-        await self.application.updater.start_polling()
+        # chat_member не приходит по умолчанию — запрашиваем все типы обновлений явно
+        await self.application.updater.start_polling(allowed_updates=Update.ALL_TYPES)
 
         # Запускаем фоновые сервисы из контейнера
         shame_service = self.container.get(ShameService)
@@ -216,6 +216,11 @@ class ServiceContainer:
         """
         return list(self._services.keys())
 
+    @property
+    def service_count(self) -> int:
+        """Количество зарегистрированных сервисов (без построения списка)."""
+        return len(self._services)
+
     def __repr__(self) -> str:
         """Строковое представление контейнера."""
         services = [f"{s.__name__} ({d.lifetime.value})" for s, d in self._services.items()]
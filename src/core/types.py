@@ -15,7 +15,7 @@ SteamId64 = NewType("SteamId64", int)
 MatchId = NewType("MatchId", int)
 
 # Временные типы
-Timestamp = NewType("Timestamp", str)  # ISO format
+Timestamp = NewType("Timestamp", int)  # Unix epoch, секунды
 Minutes = NewType("Minutes", int)
 Seconds = NewType("Seconds", int)
 
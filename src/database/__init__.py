@@ -1,12 +1,50 @@
+"""
+Слой доступа к данным.
+
+Репозитории импортируются лениво (PEP 562): `from src.database import Database`
+не загружает модули репозиториев.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from .connection import Database
-from .repositories import (
-    BanStatsRepository,
-    ChatSettingsRepository,
-    SpamRepository,
-    ViolationRepository,
-    WhitelistRepository,
-)
-from .steam_repository import SteamLinkRepository
+
+if TYPE_CHECKING:
+    from .repositories import (
+        BanStatsRepository,
+        ChatSettingsRepository,
+        SpamRepository,
+        ViolationRepository,
+        WhitelistRepository,
+    )
+    from .steam_repository import SteamLinkRepository
+
+# Имя -> модуль, из которого оно импортируется при первом обращении
+_LAZY = {
+    "SpamRepository": ".repositories",
+    "ViolationRepository": ".repositories",
+    "WhitelistRepository": ".repositories",
+    "ChatSettingsRepository": ".repositories",
+    "BanStatsRepository": ".repositories",
+    "SteamLinkRepository": ".steam_repository",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Кэшируем в модуле, чтобы следующие обращения не шли через __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + list(_LAZY))
+
 
 __all__ = [
     "Database",
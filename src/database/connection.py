@@ -4,9 +4,10 @@
 
 import asyncio
 import logging
+import os
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, List, Optional
 
 import aiosqlite
 
@@ -16,10 +17,45 @@ logger = logging.getLogger(__name__)
 class Database:
     """Асинхронный менеджер подключения к БД."""
 
+    # Настройки соединения: WAL, без fsync на каждый коммит, временные данные в памяти,
+    # mmap 256 МБ и кэш страниц 64 МБ.
+    # В WAL с synchronous=NORMAL коммит только дописывает кадры в WAL-файл, fsync бывает
+    # лишь на checkpoint — поэтому запись спама коммитится сразу, без отдельной очереди
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA cache_size=-65536",
+    )
+
+    # Настройки соединений-читателей: только чтение и кэш страниц поменьше (16 МБ).
+    # journal_mode и synchronous задаёт основное соединение
+    READER_PRAGMAS = (
+        "PRAGMA query_only=1",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA cache_size=-16384",
+    )
+
+    # Число соединений-читателей. В WAL читатели не блокируют писателя и друг друга
+    READ_POOL_SIZE = min(4, os.cpu_count() or 1)
+
+    # Размер кэша подготовленных выражений sqlite3 (ключ — текст SQL).
+    # С запасом покрывает все запросы репозиториев, чтобы горячие запросы
+    # не вытеснялись и не парсились заново.
+    STATEMENT_CACHE_SIZE = 256
+
+    # Интервал фонового обслуживания (PRAGMA optimize + checkpoint WAL), секунд
+    OPTIMIZE_INTERVAL = 7 * 24 * 3600  # неделя
+
     def __init__(self, db_path: str):
         self.db_path = db_path
         self._conn: Optional[aiosqlite.Connection] = None
         self._lock = asyncio.Lock()
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
         self._ensure_directory()
 
     def _ensure_directory(self) -> None:
@@ -30,17 +66,59 @@ class Database:
         """Инициализация долгоживущего соединения."""
         async with self._lock:
             if self._conn is None:
-                self._conn = await aiosqlite.connect(self.db_path)
+                self._conn = await aiosqlite.connect(self.db_path, cached_statements=self.STATEMENT_CACHE_SIZE)
                 self._conn.row_factory = aiosqlite.Row
+                await self._configure(self._conn)
                 logger.info("✅ Database connection established")
 
                 # Автоматически применяем миграции после подключения
                 await self.migrate()
 
+                # Читателей открываем после миграций, чтобы они видели актуальную схему.
+                # У каждого соединения к :memory: своя БД, поэтому там читаем через основное
+                if self.db_path != ":memory:":
+                    await self._open_readers()
+
+                self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def _configure(self, conn: aiosqlite.Connection, pragmas: tuple = PRAGMAS) -> None:
+        """Применяет PRAGMA-настройки к новому соединению."""
+        for pragma in pragmas:
+            await conn.execute(pragma)
+
+    async def _open_readers(self) -> None:
+        """Открывает пул соединений только для чтения."""
+        for _ in range(self.READ_POOL_SIZE):
+            reader = await aiosqlite.connect(self.db_path, cached_statements=self.STATEMENT_CACHE_SIZE)
+            reader.row_factory = aiosqlite.Row
+            await self._configure(reader, self.READER_PRAGMAS)
+            self._readers.append(reader)
+            self._idle_readers.put_nowait(reader)
+        logger.info("✅ Opened %d read-only connection(s)", len(self._readers))
+
     async def close(self) -> None:
         """Закрытие соединения."""
+        # Останавливаем обслуживание до захвата блокировки — цикл сам её берёт
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._maintenance_task = None
+
         async with self._lock:
+            for reader in self._readers:
+                await reader.close()
+            self._readers = []
+            self._idle_readers = asyncio.Queue()
+
             if self._conn is not None:
+                # Обновляем статистику планировщика перед закрытием
+                try:
+                    await self._conn.execute("PRAGMA optimize")
+                except aiosqlite.Error as e:
+                    logger.warning("PRAGMA optimize failed: %s", e)
                 await self._conn.close()
                 self._conn = None
                 logger.info("✅ Database connection closed")
@@ -57,9 +135,47 @@ class Database:
                 await self._conn.commit()
             except Exception as e:
                 await self._conn.rollback()
-                logger.error(f"Database error: {e}")
+                logger.error("Database error: %s", e)
                 raise
 
+    @asynccontextmanager
+    async def read_connection(self) -> AsyncGenerator[aiosqlite.Connection, None]:
+        """Async context manager для соединения только на чтение.
+
+        Берёт свободного читателя из пула и не ждёт блокировку писателя.
+        Если пула нет (БД в памяти), читает через основное соединение.
+        """
+        if not self._readers:
+            async with self.connection() as conn:
+                yield conn
+            return
+
+        reader = await self._idle_readers.get()
+        try:
+            yield reader
+        finally:
+            # Читатель мог быть закрыт в close(), пока был занят
+            if reader in self._readers:
+                self._idle_readers.put_nowait(reader)
+
+    async def optimize(self) -> None:
+        """Обновляет статистику планировщика и усекает WAL-файл."""
+        async with self.connection() as conn:
+            await conn.execute("PRAGMA optimize")
+            await conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info("🔧 Database optimized")
+
+    async def _maintenance_loop(self) -> None:
+        """Периодическое обслуживание БД."""
+        while True:
+            await asyncio.sleep(self.OPTIMIZE_INTERVAL)
+            try:
+                await self.optimize()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("❌ Database maintenance error: %s", e, exc_info=True)
+
     async def migrate(self) -> None:
         """Применяет все необходимые миграции к базе данных."""
         if self._conn is None:
@@ -13,11 +13,23 @@ from .migration_001_initial_schema import downgrade as m001_downgrade
 from .migration_001_initial_schema import upgrade as m001_upgrade
 from .migration_002_unique_steam_account import downgrade as m002_downgrade
 from .migration_002_unique_steam_account import upgrade as m002_upgrade
+from .migration_003_violations_banned_index import downgrade as m003_downgrade
+from .migration_003_violations_banned_index import upgrade as m003_upgrade
+from .migration_004_integer_timestamps import downgrade as m004_downgrade
+from .migration_004_integer_timestamps import upgrade as m004_upgrade
+from .migration_005_covering_indexes import downgrade as m005_downgrade
+from .migration_005_covering_indexes import upgrade as m005_upgrade
+from .migration_006_spam_timestamp_index import downgrade as m006_downgrade
+from .migration_006_spam_timestamp_index import upgrade as m006_upgrade
 
 # Список всех миграций в порядке применения
 MIGRATIONS: List[Tuple[int, Callable[[aiosqlite.Connection], Awaitable[None]], Callable[[aiosqlite.Connection], Awaitable[None]], str]] = [
     (1, m001_upgrade, m001_downgrade, "Initial database schema"),
     (2, m002_upgrade, m002_downgrade, "Add UNIQUE constraint on steam_links.account_id"),
+    (3, m003_upgrade, m003_downgrade, "Add partial index on violations for active bans"),
+    (4, m004_upgrade, m004_downgrade, "Store timestamps as INTEGER epoch seconds"),
+    (5, m005_upgrade, m005_downgrade, "Add covering indexes for spam_records and ban_stats"),
+    (6, m006_upgrade, m006_downgrade, "Add timestamp index on spam_records for cleanup"),
 ]
 
 
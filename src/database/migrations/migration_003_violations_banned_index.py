@@ -0,0 +1,23 @@
+"""
+Миграция 003: Частичный индекс на violations для активных банов.
+
+Проверка "забанен ли пользователь" выполняется на каждое сообщение,
+а banned_until заполнен лишь у малой части строк. Частичный индекс
+WHERE banned_until IS NOT NULL содержит только такие строки и остаётся
+маленьким независимо от размера таблицы.
+"""
+import aiosqlite
+
+
+async def upgrade(conn: aiosqlite.Connection) -> None:
+    """Применение миграции: создание частичного индекса."""
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_violations_banned
+        ON violations(chat_id, user_id, banned_until)
+        WHERE banned_until IS NOT NULL
+    """)
+
+
+async def downgrade(conn: aiosqlite.Connection) -> None:
+    """Откат миграции: удаление индекса."""
+    await conn.execute("DROP INDEX IF EXISTS idx_violations_banned")
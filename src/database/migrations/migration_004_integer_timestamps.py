@@ -0,0 +1,216 @@
+"""
+Миграция 004: Хранение времени в INTEGER (Unix epoch, секунды) вместо ISO-строк.
+
+Проблема:
+Все метки времени хранились как TEXT (datetime.isoformat()), а фильтры
+по окну (count_recent, cleanup, is_banned, get_stats) сравнивали строки.
+Целые числа занимают меньше места и сравниваются дешевле.
+
+Решение:
+SQLite не меняет тип колонки через ALTER, а колонка с affinity TEXT
+превратила бы записанные числа обратно в строки. Поэтому каждая таблица
+пересоздаётся с INTEGER-колонками, данные копируются с конвертацией:
+ISO-строки писались в локальном времени, модификатор 'utc' переводит
+их в UTC перед получением epoch.
+"""
+import logging
+from typing import Dict, Tuple
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+# Схемы таблиц с INTEGER-временем
+_SCHEMAS: Dict[str, str] = {
+    "spam_records": """
+        CREATE TABLE spam_records_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            chat_id INTEGER NOT NULL,
+            spam_type TEXT NOT NULL,
+            content_hash TEXT,
+            timestamp INTEGER NOT NULL
+        )
+    """,
+    "violations": """
+        CREATE TABLE violations_new (
+            user_id INTEGER NOT NULL,
+            chat_id INTEGER NOT NULL,
+            count INTEGER DEFAULT 0,
+            last_violation INTEGER,
+            banned_until INTEGER,
+            PRIMARY KEY (user_id, chat_id)
+        )
+    """,
+    "whitelist": """
+        CREATE TABLE whitelist_new (
+            user_id INTEGER NOT NULL,
+            chat_id INTEGER NOT NULL,
+            added_by INTEGER,
+            added_at INTEGER,
+            PRIMARY KEY (user_id, chat_id)
+        )
+    """,
+    "chat_settings": """
+        CREATE TABLE chat_settings_new (
+            chat_id INTEGER PRIMARY KEY,
+            sticker_limit INTEGER DEFAULT 3,
+            sticker_window INTEGER DEFAULT 30,
+            text_limit INTEGER DEFAULT 3,
+            text_window INTEGER DEFAULT 20,
+            image_limit INTEGER DEFAULT 3,
+            image_window INTEGER DEFAULT 30,
+            video_limit INTEGER DEFAULT 3,
+            video_window INTEGER DEFAULT 30,
+            warning_enabled INTEGER DEFAULT 1,
+            updated_at INTEGER
+        )
+    """,
+    "ban_stats": """
+        CREATE TABLE ban_stats_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            chat_id INTEGER NOT NULL,
+            ban_type TEXT NOT NULL,
+            ban_minutes INTEGER NOT NULL,
+            reason TEXT,
+            timestamp INTEGER NOT NULL
+        )
+    """,
+    "steam_links": """
+        CREATE TABLE steam_links_new (
+            user_id INTEGER PRIMARY KEY,
+            account_id INTEGER NOT NULL UNIQUE,
+            persona_name TEXT,
+            linked_at INTEGER NOT NULL
+        )
+    """,
+    "shame_subscriptions": """
+        CREATE TABLE shame_subscriptions_new (
+            user_id INTEGER NOT NULL,
+            chat_id INTEGER NOT NULL,
+            last_match_id INTEGER,
+            subscribed_at INTEGER NOT NULL,
+            PRIMARY KEY (user_id, chat_id)
+        )
+    """,
+}
+
+# Колонки таблиц: (все колонки, колонки со временем, обязательные колонки со временем)
+_COLUMNS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]] = {
+    "spam_records": (
+        ("id", "user_id", "chat_id", "spam_type", "content_hash", "timestamp"),
+        ("timestamp",),
+        ("timestamp",),
+    ),
+    "violations": (
+        ("user_id", "chat_id", "count", "last_violation", "banned_until"),
+        ("last_violation", "banned_until"),
+        (),
+    ),
+    "whitelist": (
+        ("user_id", "chat_id", "added_by", "added_at"),
+        ("added_at",),
+        (),
+    ),
+    "chat_settings": (
+        (
+            "chat_id",
+            "sticker_limit",
+            "sticker_window",
+            "text_limit",
+            "text_window",
+            "image_limit",
+            "image_window",
+            "video_limit",
+            "video_window",
+            "warning_enabled",
+            "updated_at",
+        ),
+        ("updated_at",),
+        (),
+    ),
+    "ban_stats": (
+        ("id", "user_id", "chat_id", "ban_type", "ban_minutes", "reason", "timestamp"),
+        ("timestamp",),
+        ("timestamp",),
+    ),
+    "steam_links": (
+        ("user_id", "account_id", "persona_name", "linked_at"),
+        ("linked_at",),
+        ("linked_at",),
+    ),
+    "shame_subscriptions": (
+        ("user_id", "chat_id", "last_match_id", "subscribed_at"),
+        ("subscribed_at",),
+        ("subscribed_at",),
+    ),
+}
+
+# Индексы, которые пропадают вместе со старыми таблицами
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_spam_user_type ON spam_records(user_id, chat_id, spam_type, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_ban_stats_chat_time ON ban_stats(chat_id, timestamp)",
+    """CREATE INDEX IF NOT EXISTS idx_violations_banned ON violations(chat_id, user_id, banned_until)
+       WHERE banned_until IS NOT NULL""",
+)
+
+
+def _to_epoch(column: str, required: bool) -> str:
+    """SQL-выражение: ISO-строка в локальном времени -> Unix epoch."""
+    expr = f"CAST(strftime('%s', {column}, 'utc') AS INTEGER)"
+    if required:
+        expr = f"COALESCE({expr}, CAST(strftime('%s', 'now') AS INTEGER))"
+    return expr
+
+
+def _to_iso(column: str, required: bool) -> str:
+    """SQL-выражение: Unix epoch -> ISO-строка в локальном времени."""
+    return f"strftime('%Y-%m-%dT%H:%M:%S', {column}, 'unixepoch', 'localtime')"
+
+
+async def _table_exists(conn: aiosqlite.Connection, table: str) -> bool:
+    cursor = await conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
+    return await cursor.fetchone() is not None
+
+
+async def _rebuild(conn: aiosqlite.Connection, table: str, create_sql: str, convert) -> None:
+    """Пересоздаёт таблицу по новой схеме, конвертируя колонки со временем."""
+    columns, time_columns, required = _COLUMNS[table]
+
+    await conn.execute(create_sql)
+
+    if await _table_exists(conn, table):
+        select_exprs = ", ".join(
+            convert(col, col in required) if col in time_columns else col for col in columns
+        )
+        column_list = ", ".join(columns)
+        await conn.execute(f"INSERT INTO {table}_new ({column_list}) SELECT {select_exprs} FROM {table}")
+        await conn.execute(f"DROP TABLE {table}")
+
+    await conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+
+async def upgrade(conn: aiosqlite.Connection) -> None:
+    """Применение миграции: перевод времени в INTEGER epoch."""
+    for table, create_sql in _SCHEMAS.items():
+        await _rebuild(conn, table, create_sql, _to_epoch)
+
+    for index_sql in _INDEXES:
+        await conn.execute(index_sql)
+
+    logger.info("✅ Timestamps converted to INTEGER epoch")
+
+
+async def downgrade(conn: aiosqlite.Connection) -> None:
+    """Откат миграции: возврат к TEXT ISO-строкам."""
+    for table, create_sql in _SCHEMAS.items():
+        text_sql = create_sql
+        for col in _COLUMNS[table][1]:
+            text_sql = text_sql.replace(f"{col} INTEGER", f"{col} TEXT")
+        await _rebuild(conn, table, text_sql, _to_iso)
+
+    for index_sql in _INDEXES:
+        await conn.execute(index_sql)
+
+    logger.info("✅ Timestamps converted back to TEXT")
@@ -0,0 +1,42 @@
+"""
+Миграция 005: Покрывающие индексы для count_recent и get_stats.
+
+count_recent фильтрует spam_records по (user_id, chat_id, spam_type, timestamp[, content_hash]),
+get_stats фильтрует ban_stats по (chat_id, timestamp) и агрегирует ban_type, user_id, ban_minutes.
+Новые индексы содержат все нужные колонки, и запросы выполняются без обращения к таблице.
+Старые индексы являются их префиксами и удаляются.
+"""
+import aiosqlite
+
+
+async def upgrade(conn: aiosqlite.Connection) -> None:
+    """Применение миграции: покрывающие индексы вместо префиксных."""
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_spam_lookup
+        ON spam_records(user_id, chat_id, spam_type, timestamp, content_hash)
+    """)
+    await conn.execute("DROP INDEX IF EXISTS idx_spam_user_type")
+
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ban_stats_chat_ts
+        ON ban_stats(chat_id, timestamp, ban_type, user_id, ban_minutes)
+    """)
+    await conn.execute("DROP INDEX IF EXISTS idx_ban_stats_chat_time")
+
+    # Собираем статистику, чтобы планировщик выбирал новые индексы
+    await conn.execute("ANALYZE")
+
+
+async def downgrade(conn: aiosqlite.Connection) -> None:
+    """Откат миграции: возврат префиксных индексов."""
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_spam_user_type
+        ON spam_records(user_id, chat_id, spam_type, timestamp)
+    """)
+    await conn.execute("DROP INDEX IF EXISTS idx_spam_lookup")
+
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ban_stats_chat_time
+        ON ban_stats(chat_id, timestamp)
+    """)
+    await conn.execute("DROP INDEX IF EXISTS idx_ban_stats_chat_ts")
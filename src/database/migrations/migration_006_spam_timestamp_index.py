@@ -0,0 +1,17 @@
+"""
+Миграция 006: Индекс по времени для очистки spam_records.
+
+cleanup_old_records удаляет записи пачками по условию timestamp < cutoff.
+Индекс превращает выборку каждой пачки в range scan вместо полного прохода по таблице.
+"""
+import aiosqlite
+
+
+async def upgrade(conn: aiosqlite.Connection) -> None:
+    """Применение миграции: индекс spam_records(timestamp)."""
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_spam_timestamp ON spam_records(timestamp)")
+
+
+async def downgrade(conn: aiosqlite.Connection) -> None:
+    """Откат миграции: удаление индекса."""
+    await conn.execute("DROP INDEX IF EXISTS idx_spam_timestamp")
@@ -35,14 +35,14 @@ class MigrationManager:
         cursor = await self.conn.execute("SELECT MAX(version) as version FROM schema_version")
         row = await cursor.fetchone()
         version = row[0] if row and row[0] is not None else 0
-        logger.debug(f"Current schema version: {version}")
+        logger.debug("Current schema version: %d", version)
         return version
 
     async def apply_migration(
         self, version: int, upgrade_func: Callable[[aiosqlite.Connection], Awaitable[None]], description: str = ""
     ) -> None:
         """Применяет одну миграцию."""
-        logger.info(f"📦 Applying migration {version:03d}: {description}")
+        logger.info("📦 Applying migration %03d: %s", version, description)
 
         try:
             # Применяем миграцию
@@ -58,10 +58,10 @@ class MigrationManager:
             )
             await self.conn.commit()
 
-            logger.info(f"✅ Migration {version:03d} applied successfully")
+            logger.info("✅ Migration %03d applied successfully", version)
         except Exception as e:
             await self.conn.rollback()
-            logger.error(f"❌ Failed to apply migration {version:03d}: {e}")
+            logger.error("❌ Failed to apply migration %03d: %s", version, e)
             raise
 
     async def migrate_to_latest(self, migrations: List[Tuple[int, Callable, Callable, str]]) -> None:
@@ -83,7 +83,7 @@ class MigrationManager:
             logger.info("✅ Database schema is up to date")
             return
 
-        logger.info(f"📦 Found {len(pending_migrations)} pending migration(s)")
+        logger.info("📦 Found %d pending migration(s)", len(pending_migrations))
 
         for version, upgrade_func, _, description in pending_migrations:
             await self.apply_migration(version, upgrade_func, description)
@@ -94,7 +94,7 @@ class MigrationManager:
         self, version: int, downgrade_func: Callable[[aiosqlite.Connection], Awaitable[None]], description: str = ""
     ) -> None:
         """Откатывает миграцию."""
-        logger.info(f"⏪ Rolling back migration {version:03d}: {description}")
+        logger.info("⏪ Rolling back migration %03d: %s", version, description)
 
         try:
             # Откатываем миграцию
@@ -104,8 +104,8 @@ class MigrationManager:
             await self.conn.execute("DELETE FROM schema_version WHERE version = ?", (version,))
             await self.conn.commit()
 
-            logger.info(f"✅ Migration {version:03d} rolled back successfully")
+            logger.info("✅ Migration %03d rolled back successfully", version)
         except Exception as e:
             await self.conn.rollback()
-            logger.error(f"❌ Failed to rollback migration {version:03d}: {e}")
+            logger.error("❌ Failed to rollback migration %03d: %s", version, e)
             raise
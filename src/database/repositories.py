@@ -3,17 +3,54 @@
 """
 
 import logging
-from datetime import datetime, timedelta
+import time
+from collections import Counter
 from typing import Any, Dict, List, Optional, Tuple
 
 from .connection import Database
 
 logger = logging.getLogger(__name__)
 
+# SQL запросов, которые выполняются на каждое сообщение. Одна строка на запрос —
+# один ключ в кэше подготовленных выражений sqlite3 (кэш ключуется текстом SQL)
+_SQL_INSERT_SPAM = (
+    "INSERT INTO spam_records (user_id, chat_id, spam_type, content_hash, timestamp) VALUES (?, ?, ?, ?, ?)"
+)
+# ?5 IS NULL OR ...: один запрос и для подсчёта с content_hash, и без него
+_SQL_ADD_AND_COUNT = (
+    "INSERT INTO spam_records (user_id, chat_id, spam_type, timestamp, content_hash) "
+    "VALUES (?1, ?2, ?3, ?4, ?5) "
+    "RETURNING (SELECT COUNT(*) FROM spam_records WHERE user_id = ?1 AND chat_id = ?2 "
+    "AND spam_type = ?3 AND timestamp >= ?6 AND (?5 IS NULL OR content_hash = ?5))"
+)
+_SQL_COUNT_RECENT = (
+    "SELECT COUNT(*) FROM spam_records WHERE user_id = ?1 AND chat_id = ?2 AND spam_type = ?3 "
+    "AND timestamp >= ?4 AND (?5 IS NULL OR content_hash = ?5)"
+)
+_SQL_ADD_VIOLATION = """
+    INSERT INTO violations (user_id, chat_id, count, last_violation, banned_until)
+    VALUES (?, ?, 1, ?, ?)
+    ON CONFLICT(user_id, chat_id) DO UPDATE SET
+        count = violations.count + 1,
+        last_violation = excluded.last_violation,
+        banned_until = excluded.banned_until
+    RETURNING count
+"""
+_SQL_IS_BANNED = "SELECT 1 FROM violations WHERE chat_id = ? AND user_id = ? AND banned_until > ? LIMIT 1"
+_SQL_IS_WHITELISTED = "SELECT EXISTS(SELECT 1 FROM whitelist WHERE user_id = ? AND chat_id = ?)"
+_SQL_GET_SETTINGS = """
+    SELECT sticker_limit, sticker_window, text_limit, text_window,
+           image_limit, image_window, video_limit, video_window, warning_enabled
+    FROM chat_settings WHERE chat_id = ?
+"""
+
 
 class SpamRepository:
     """Репозиторий для записей спама."""
 
+    # Сколько строк удаляется за одну транзакцию при очистке
+    CLEANUP_BATCH_SIZE = 5000
+
     def __init__(self, db: Database):
         self.db = db
 
@@ -26,69 +63,60 @@ class SpamRepository:
         Returns:
             Количество удаленных записей
         """
-        cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
+        cutoff = int(time.time()) - hours * 3600
+        deleted_count = 0
 
-        async with self.db.connection() as conn:
-            cursor = await conn.execute("DELETE FROM spam_records WHERE timestamp < ?", (cutoff,))
-            deleted_count = cursor.rowcount
-            logger.info(f"🧹 Cleaned up {deleted_count} old spam records (older than {hours}h)")
-            return deleted_count
+        # Удаляем пачками: каждая пачка — отдельная транзакция, между ними
+        # блокировка отпускается и остальные запросы не ждут всю очистку
+        while True:
+            async with self.db.connection() as conn:
+                cursor = await conn.execute(
+                    """
+                    DELETE FROM spam_records WHERE rowid IN (
+                        SELECT rowid FROM spam_records WHERE timestamp < ? LIMIT ?
+                    )
+                """,
+                    (cutoff, self.CLEANUP_BATCH_SIZE),
+                )
+                batch = cursor.rowcount
+
+            deleted_count += batch
+            if batch < self.CLEANUP_BATCH_SIZE:
+                break
+
+        logger.info(f"🧹 Cleaned up {deleted_count} old spam records (older than {hours}h)")
+        return deleted_count
 
     async def add_record(self, user_id: int, chat_id: int, spam_type: str, content_hash: str = None) -> None:
         """Добавляет запись о спаме."""
         async with self.db.connection() as conn:
-            await conn.execute(
-                "INSERT INTO spam_records (user_id, chat_id, spam_type, content_hash, timestamp) VALUES (?, ?, ?, ?, ?)",
-                (user_id, chat_id, spam_type, content_hash, datetime.now().isoformat()),
-            )
+            await conn.execute(_SQL_INSERT_SPAM, (user_id, chat_id, spam_type, content_hash, int(time.time())))
 
     async def add_and_count_recent(
         self, user_id: int, chat_id: int, spam_type: str, window_seconds: int, content_hash: str = None
     ) -> int:
         """Атомарно добавляет запись и возвращает количество за период."""
-        async with self.db.connection() as conn:
-            now = datetime.now().isoformat()
-            cutoff = (datetime.now() - timedelta(seconds=window_seconds)).isoformat()
+        now = int(time.time())
+        cutoff = now - window_seconds
 
-            # Добавляем запись
-            await conn.execute(
-                "INSERT INTO spam_records (user_id, chat_id, spam_type, timestamp, content_hash) VALUES (?, ?, ?, ?, ?)",
-                (user_id, chat_id, spam_type, now, content_hash),
+        async with self.db.connection() as conn:
+            # Вставка и подсчёт одним запросом: подзапрос в RETURNING видит только что вставленную строку
+            cursor = await conn.execute(
+                _SQL_ADD_AND_COUNT, (user_id, chat_id, spam_type, now, content_hash or None, cutoff)
             )
-
-            # Считаем записи за период
-            if content_hash:
-                cursor = await conn.execute(
-                    "SELECT COUNT(*) FROM spam_records WHERE user_id = ? AND chat_id = ? AND spam_type = ? AND timestamp >= ? AND content_hash = ?",
-                    (user_id, chat_id, spam_type, cutoff, content_hash),
-                )
-            else:
-                cursor = await conn.execute(
-                    "SELECT COUNT(*) FROM spam_records WHERE user_id = ? AND chat_id = ? AND spam_type = ? AND timestamp >= ?",
-                    (user_id, chat_id, spam_type, cutoff),
-                )
             row = await cursor.fetchone()
+            await cursor.close()
             return row[0] if row else 0
 
     async def count_recent(
         self, user_id: int, chat_id: int, spam_type: str, window_seconds: int, content_hash: str = None
     ) -> int:
         """Считает записи за последние N секунд."""
-        cutoff = (datetime.now() - timedelta(seconds=window_seconds)).isoformat()
+        cutoff = int(time.time()) - window_seconds
 
-        async with self.db.connection() as conn:
+        async with self.db.read_connection() as conn:
             # Считаем актуальные записи (старые удаляются фоновой задачей)
-            if content_hash:
-                cursor = await conn.execute(
-                    "SELECT COUNT(*) FROM spam_records WHERE user_id = ? AND chat_id = ? AND spam_type = ? AND timestamp >= ? AND content_hash = ?",
-                    (user_id, chat_id, spam_type, cutoff, content_hash),
-                )
-            else:
-                cursor = await conn.execute(
-                    "SELECT COUNT(*) FROM spam_records WHERE user_id = ? AND chat_id = ? AND spam_type = ? AND timestamp >= ?",
-                    (user_id, chat_id, spam_type, cutoff),
-                )
-
+            cursor = await conn.execute(_SQL_COUNT_RECENT, (user_id, chat_id, spam_type, cutoff, content_hash or None))
             result = await cursor.fetchone()
             return result[0] if result else 0
 
@@ -104,9 +132,9 @@ class ViolationRepository:
     def __init__(self, db: Database):
         self.db = db
 
-    async def get_info(self, user_id: int, chat_id: int) -> Tuple[int, Optional[str]]:
-        """Возвращает (count, banned_until) для пользователя."""
-        async with self.db.connection() as conn:
+    async def get_info(self, user_id: int, chat_id: int) -> Tuple[int, Optional[int]]:
+        """Возвращает (count, banned_until) для пользователя; banned_until — Unix epoch."""
+        async with self.db.read_connection() as conn:
             cursor = await conn.execute(
                 "SELECT count, banned_until FROM violations WHERE user_id = ? AND chat_id = ?", (user_id, chat_id)
             )
@@ -118,59 +146,26 @@ class ViolationRepository:
 
     async def increment_and_get(self, user_id: int, chat_id: int, ban_minutes: int) -> int:
         """Атомарно увеличивает счетчик нарушений и возвращает новое значение."""
-        async with self.db.connection() as conn:
-            # Получаем текущий счетчик
-            cursor = await conn.execute(
-                "SELECT count FROM violations WHERE user_id = ? AND chat_id = ?", (user_id, chat_id)
-            )
-            row = await cursor.fetchone()
-
-            if row:
-                new_count = row[0] + 1
-                until = (datetime.now() + timedelta(minutes=ban_minutes)).isoformat()
-                await conn.execute(
-                    "UPDATE violations SET count = ?, banned_until = ? WHERE user_id = ? AND chat_id = ?",
-                    (new_count, until, user_id, chat_id),
-                )
-            else:
-                new_count = 1
-                until = (datetime.now() + timedelta(minutes=ban_minutes)).isoformat()
-                await conn.execute(
-                    "INSERT INTO violations (user_id, chat_id, count, banned_until) VALUES (?, ?, ?, ?)",
-                    (user_id, chat_id, new_count, until),
-                )
-
-            return new_count
+        return await self.add_violation(user_id, chat_id, ban_minutes)
 
     async def add_violation(self, user_id: int, chat_id: int, ban_minutes: int) -> int:
         """Добавляет нарушение, возвращает новый счётчик."""
-        now = datetime.now().isoformat()
-        until = (datetime.now() + timedelta(minutes=ban_minutes)).isoformat()
+        now = int(time.time())
+        until = now + ban_minutes * 60
 
         async with self.db.connection() as conn:
-            cursor = await conn.execute(
-                "SELECT count FROM violations WHERE user_id = ? AND chat_id = ?", (user_id, chat_id)
-            )
-            result = await cursor.fetchone()
-
-            new_count = (result[0] + 1) if result else 1
-
-            await conn.execute(
-                """
-                INSERT OR REPLACE INTO violations (user_id, chat_id, count, last_violation, banned_until)
-                VALUES (?, ?, ?, ?, ?)
-            """,
-                (user_id, chat_id, new_count, now, until),
-            )
-
-            return new_count
+            # UPSERT по первичному ключу (user_id, chat_id): один атомарный запрос без предварительного SELECT
+            cursor = await conn.execute(_SQL_ADD_VIOLATION, (user_id, chat_id, now, until))
+            row = await cursor.fetchone()
+            await cursor.close()
+            return row[0]
 
     async def is_banned(self, user_id: int, chat_id: int) -> bool:
         """Проверяет, забанен ли пользователь сейчас."""
-        _, banned_until = await self.get_info(user_id, chat_id)
-        if banned_until:
-            return banned_until > datetime.now().isoformat()
-        return False
+        # Сравнение banned_until > ? подразумевает NOT NULL, поэтому подходит частичный индекс idx_violations_banned
+        async with self.db.read_connection() as conn:
+            cursor = await conn.execute(_SQL_IS_BANNED, (chat_id, user_id, int(time.time())))
+            return await cursor.fetchone() is not None
 
     async def remove_ban(self, user_id: int, chat_id: int) -> bool:
         """Снимает бан (обнуляет banned_until)."""
@@ -188,12 +183,13 @@ class ViolationRepository:
 
     async def get_top(self, chat_id: int, limit: int = 10) -> List[Tuple[int, int]]:
         """Возвращает топ нарушителей чата."""
-        async with self.db.connection() as conn:
+        async with self.db.read_connection() as conn:
             cursor = await conn.execute(
                 "SELECT user_id, count FROM violations WHERE chat_id = ? ORDER BY count DESC LIMIT ?", (chat_id, limit)
             )
-            results = await cursor.fetchall()
-            return [(r[0], r[1]) for r in results]
+            # Без Row-фабрики sqlite3 сразу отдаёт обычные кортежи
+            cursor.row_factory = None
+            return await cursor.fetchall()
 
 
 class WhitelistRepository:
@@ -204,19 +200,21 @@ class WhitelistRepository:
 
     async def is_whitelisted(self, user_id: int, chat_id: int) -> bool:
         """Проверяет, в белом списке ли пользователь."""
-        async with self.db.connection() as conn:
-            cursor = await conn.execute("SELECT 1 FROM whitelist WHERE user_id = ? AND chat_id = ?", (user_id, chat_id))
-            result = await cursor.fetchone()
-            return result is not None
+        async with self.db.read_connection() as conn:
+            cursor = await conn.execute(_SQL_IS_WHITELISTED, (user_id, chat_id))
+            return bool((await cursor.fetchone())[0])
 
     async def add(self, user_id: int, chat_id: int, added_by: int = None) -> bool:
         """Добавляет в белый список."""
         async with self.db.connection() as conn:
-            await conn.execute(
-                "INSERT OR REPLACE INTO whitelist (user_id, chat_id, added_by, added_at) VALUES (?, ?, ?, ?)",
-                (user_id, chat_id, added_by, datetime.now().isoformat()),
+            cursor = await conn.execute(
+                "INSERT OR REPLACE INTO whitelist (user_id, chat_id, added_by, added_at) VALUES (?, ?, ?, ?) "
+                "RETURNING user_id",
+                (user_id, chat_id, added_by, int(time.time())),
             )
-            return True
+            row = await cursor.fetchone()
+            await cursor.close()
+            return row is not None
 
     async def remove(self, user_id: int, chat_id: int) -> bool:
         """Удаляет из белого списка."""
@@ -224,12 +222,13 @@ class WhitelistRepository:
             cursor = await conn.execute("DELETE FROM whitelist WHERE user_id = ? AND chat_id = ?", (user_id, chat_id))
             return cursor.rowcount > 0
 
-    async def get_all(self, chat_id: int) -> List[Tuple[int, str]]:
+    async def get_all(self, chat_id: int) -> List[Tuple[int, int]]:
         """Возвращает белый список чата."""
-        async with self.db.connection() as conn:
+        async with self.db.read_connection() as conn:
             cursor = await conn.execute("SELECT user_id, added_at FROM whitelist WHERE chat_id = ?", (chat_id,))
-            results = await cursor.fetchall()
-            return [(r[0], r[1]) for r in results]
+            # Без Row-фабрики sqlite3 сразу отдаёт обычные кортежи
+            cursor.row_factory = None
+            return await cursor.fetchall()
 
 
 class ChatSettingsRepository:
@@ -247,78 +246,99 @@ class ChatSettingsRepository:
         "warning_enabled": 1,
     }
 
+    # Сколько секунд настройки чата живут в кэше
+    CACHE_TTL = 60
+
     def __init__(self, db: Database):
         self.db = db
+        # chat_id -> (момент истечения по time.monotonic(), настройки)
+        self._cache: Dict[int, Tuple[float, Dict[str, Any]]] = {}
 
     async def get(self, chat_id: int) -> Dict[str, Any]:
-        """Возвращает настройки чата."""
-        async with self.db.connection() as conn:
-            cursor = await conn.execute("SELECT * FROM chat_settings WHERE chat_id = ?", (chat_id,))
+        """Возвращает настройки чата.
+
+        Вызывается на каждое сообщение, поэтому результат кэшируется на CACHE_TTL секунд.
+        """
+        cached = self._cache.get(chat_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1].copy()
+
+        async with self.db.read_connection() as conn:
+            cursor = await conn.execute(_SQL_GET_SETTINGS, (chat_id,))
             result = await cursor.fetchone()
 
-            if result:
-                return {
-                    "sticker_limit": result[1],
-                    "sticker_window": result[2],
-                    "text_limit": result[3],
-                    "text_window": result[4],
-                    "image_limit": result[5],
-                    "image_window": result[6],
-                    "video_limit": result[7],
-                    "video_window": result[8],
-                    "warning_enabled": bool(result[9]),
-                }
-            return self.DEFAULT_SETTINGS.copy()
+        if result:
+            settings = {
+                "sticker_limit": result[0],
+                "sticker_window": result[1],
+                "text_limit": result[2],
+                "text_window": result[3],
+                "image_limit": result[4],
+                "image_window": result[5],
+                "video_limit": result[6],
+                "video_window": result[7],
+                "warning_enabled": bool(result[8]),
+            }
+        else:
+            settings = self.DEFAULT_SETTINGS.copy()
+
+        self._cache[chat_id] = (time.monotonic() + self.CACHE_TTL, settings)
+        return settings.copy()
 
     async def set(self, chat_id: int, key: str, value: int) -> bool:
         """Устанавливает настройку."""
         if key not in self.DEFAULT_SETTINGS:
             return False
 
+        settings = self.DEFAULT_SETTINGS.copy()
+        settings[key] = value
+
         async with self.db.connection() as conn:
-            # Проверяем существование записи
-            cursor = await conn.execute("SELECT 1 FROM chat_settings WHERE chat_id = ?", (chat_id,))
-            exists = await cursor.fetchone()
-
-            if exists:
-                await conn.execute(
-                    f"UPDATE chat_settings SET {key} = ?, updated_at = ? WHERE chat_id = ?",
-                    (value, datetime.now().isoformat(), chat_id),
-                )
-            else:
-                # Создаём с дефолтами
-                settings = self.DEFAULT_SETTINGS.copy()
-                settings[key] = value
-                await conn.execute(
-                    """
-                    INSERT INTO chat_settings
-                    (chat_id, sticker_limit, sticker_window, text_limit, text_window,
-                     image_limit, image_window, video_limit, video_window, warning_enabled, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        chat_id,
-                        settings["sticker_limit"],
-                        settings["sticker_window"],
-                        settings["text_limit"],
-                        settings["text_window"],
-                        settings["image_limit"],
-                        settings["image_window"],
-                        settings["video_limit"],
-                        settings["video_window"],
-                        settings["warning_enabled"],
-                        datetime.now().isoformat(),
-                    ),
-                )
+            # UPSERT: новый чат создаётся с дефолтами, у существующего меняется только key.
+            # key проверен по DEFAULT_SETTINGS выше, поэтому его можно подставлять в SQL
+            await conn.execute(
+                f"""
+                INSERT INTO chat_settings
+                (chat_id, sticker_limit, sticker_window, text_limit, text_window,
+                 image_limit, image_window, video_limit, video_window, warning_enabled, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(chat_id) DO UPDATE SET {key} = excluded.{key}, updated_at = excluded.updated_at
+            """,
+                (
+                    chat_id,
+                    settings["sticker_limit"],
+                    settings["sticker_window"],
+                    settings["text_limit"],
+                    settings["text_window"],
+                    settings["image_limit"],
+                    settings["image_window"],
+                    settings["video_limit"],
+                    settings["video_window"],
+                    settings["warning_enabled"],
+                    int(time.time()),
+                ),
+            )
 
-            return True
+        # Write-through: в закэшированных настройках меняем только key, остальные поля в БД не трогались.
+        # Иначе следующий клик в меню настроек снова читал бы всю строку из БД
+        cached = self._cache.get(chat_id)
+        if cached:
+            cached[1][key] = bool(value) if key == "warning_enabled" else value
+        return True
 
 
 class BanStatsRepository:
     """Репозиторий для статистики банов."""
 
+    # Сколько секунд статистика чата за период живёт в кэше
+    STATS_CACHE_TTL = 60
+    # Максимум записей в кэше статистики, при переполнении вытесняется самая старая
+    STATS_CACHE_SIZE = 2048
+
     def __init__(self, db: Database):
         self.db = db
+        # (chat_id, days) -> (момент истечения по time.monotonic(), статистика)
+        self._stats_cache: Dict[Tuple[int, int], Tuple[float, Dict[str, Any]]] = {}
 
     async def record_ban(self, user_id: int, chat_id: int, ban_type: str, ban_minutes: int, reason: str = None) -> None:
         """Записывает бан в статистику."""
@@ -328,57 +348,56 @@ class BanStatsRepository:
                 INSERT INTO ban_stats (user_id, chat_id, ban_type, ban_minutes, reason, timestamp)
                 VALUES (?, ?, ?, ?, ?, ?)
             """,
-                (user_id, chat_id, ban_type, ban_minutes, reason, datetime.now().isoformat()),
+                (user_id, chat_id, ban_type, ban_minutes, reason, int(time.time())),
             )
 
+        # Новый бан меняет статистику чата за все периоды
+        for key in [key for key in self._stats_cache if key[0] == chat_id]:
+            del self._stats_cache[key]
+
     async def get_stats(self, chat_id: int, days: int = 7) -> Dict[str, Any]:
-        """Возвращает статистику за N дней."""
-        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        """Возвращает статистику за N дней.
 
-        async with self.db.connection() as conn:
-            # Общее количество банов
-            cursor = await conn.execute(
-                "SELECT COUNT(*) FROM ban_stats WHERE chat_id = ? AND timestamp > ?", (chat_id, cutoff)
-            )
-            total = (await cursor.fetchone())[0]
+        Периоды в меню переключают часто, поэтому результат кэшируется на STATS_CACHE_TTL секунд.
+        """
+        key = (chat_id, days)
+        cached = self._stats_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return self._copy_stats(cached[1])
 
-            # По типам
-            cursor = await conn.execute(
-                """
-                SELECT ban_type, COUNT(*) as cnt
-                FROM ban_stats
-                WHERE chat_id = ? AND timestamp > ?
-                GROUP BY ban_type
-                ORDER BY cnt DESC
-            """,
-                (chat_id, cutoff),
-            )
-            by_type = {r[0]: r[1] for r in await cursor.fetchall()}
+        cutoff = int(time.time()) - days * 86400
 
-            # Топ нарушителей за период
+        # Один проход по покрывающему индексу, агрегаты считаем в Python
+        async with self.db.read_connection() as conn:
             cursor = await conn.execute(
-                """
-                SELECT user_id, COUNT(*) as cnt
-                FROM ban_stats
-                WHERE chat_id = ? AND timestamp > ?
-                GROUP BY user_id
-                ORDER BY cnt DESC
-                LIMIT 5
-            """,
+                "SELECT ban_type, user_id, ban_minutes FROM ban_stats WHERE chat_id = ? AND timestamp > ?",
                 (chat_id, cutoff),
             )
-            top_violators = [(r[0], r[1]) for r in await cursor.fetchall()]
-
-            # Суммарное время банов
-            cursor = await conn.execute(
-                "SELECT SUM(ban_minutes) FROM ban_stats WHERE chat_id = ? AND timestamp > ?", (chat_id, cutoff)
-            )
-            total_minutes = (await cursor.fetchone())[0] or 0
-
-            return {
-                "total_bans": total,
-                "by_type": by_type,
-                "top_violators": top_violators,
-                "total_ban_minutes": total_minutes,
-                "period_days": days,
-            }
+            rows = await cursor.fetchall()
+
+        by_type: Counter = Counter()
+        by_user: Counter = Counter()
+        total_minutes = 0
+        for ban_type, user_id, ban_minutes in rows:
+            by_type[ban_type] += 1
+            by_user[user_id] += 1
+            total_minutes += ban_minutes or 0
+
+        stats = {
+            "total_bans": len(rows),
+            "by_type": dict(by_type.most_common()),
+            "top_violators": by_user.most_common(5),
+            "total_ban_minutes": total_minutes,
+            "period_days": days,
+        }
+
+        if key not in self._stats_cache and len(self._stats_cache) >= self.STATS_CACHE_SIZE:
+            # dict хранит порядок вставки — первый ключ самый старый
+            self._stats_cache.pop(next(iter(self._stats_cache)))
+        self._stats_cache[key] = (time.monotonic() + self.STATS_CACHE_TTL, stats)
+        return self._copy_stats(stats)
+
+    @staticmethod
+    def _copy_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Копия статистики со своими by_type и top_violators — изменения не попадут в кэш."""
+        return {**stats, "by_type": dict(stats["by_type"]), "top_violators": list(stats["top_violators"])}
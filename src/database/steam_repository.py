@@ -3,8 +3,9 @@
 """
 
 import logging
-from datetime import datetime
-from typing import List, Optional, Tuple
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from .connection import Database
 
@@ -14,8 +15,15 @@ logger = logging.getLogger(__name__)
 class SteamLinkRepository:
     """Репозиторий для связи Telegram <-> Steam."""
 
+    # Сколько секунд привязка user_id -> account_id живёт в кэше
+    ACCOUNT_CACHE_TTL = 10
+    # Максимум записей в кэше привязок, при переполнении вытесняется самая старая
+    ACCOUNT_CACHE_SIZE = 10_000
+
     def __init__(self, db: Database):
         self.db = db
+        # user_id -> (момент истечения по time.monotonic(), account_id или None)
+        self._account_cache: Dict[int, Tuple[float, Optional[int]]] = {}
 
     async def init_table(self) -> None:
         """Создаёт таблицы если нет."""
@@ -25,7 +33,7 @@ class SteamLinkRepository:
                     user_id INTEGER PRIMARY KEY,
                     account_id INTEGER NOT NULL UNIQUE,
                     persona_name TEXT,
-                    linked_at TEXT NOT NULL
+                    linked_at INTEGER NOT NULL
                 )
             """)
 
@@ -35,7 +43,7 @@ class SteamLinkRepository:
                     user_id INTEGER NOT NULL,
                     chat_id INTEGER NOT NULL,
                     last_match_id INTEGER,
-                    subscribed_at TEXT NOT NULL,
+                    subscribed_at INTEGER NOT NULL,
                     PRIMARY KEY (user_id, chat_id)
                 )
             """)
@@ -67,31 +75,53 @@ class SteamLinkRepository:
                 INSERT OR REPLACE INTO steam_links (user_id, account_id, persona_name, linked_at)
                 VALUES (?, ?, ?, ?)
             """,
-                (user_id, account_id, persona_name, datetime.now().isoformat()),
+                (user_id, account_id, persona_name, int(time.time())),
             )
 
-            logger.info(f"✅ Linked account {account_id} to user {user_id}")
-            return True
+        # Кэш сбрасываем после коммита, иначе читатель успеет закэшировать старую привязку
+        self._account_cache.pop(user_id, None)
+        logger.info(f"✅ Linked account {account_id} to user {user_id}")
+        return True
 
     async def unlink(self, user_id: int) -> bool:
         """Отвязывает Steam аккаунт."""
         async with self.db.connection() as conn:
             cursor = await conn.execute("DELETE FROM steam_links WHERE user_id = ?", (user_id,))
-            return cursor.rowcount > 0
+
+        self._account_cache.pop(user_id, None)
+        return cursor.rowcount > 0
 
     async def get_account_id(self, user_id: int) -> Optional[int]:
-        """Возвращает Account ID по Telegram user_id."""
-        async with self.db.connection() as conn:
+        """Возвращает Account ID по Telegram user_id.
+
+        Вызывается каждой Dota-командой, поэтому результат кэшируется на ACCOUNT_CACHE_TTL секунд.
+        """
+        cached = self._account_cache.get(user_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        async with self.db.read_connection() as conn:
             cursor = await conn.execute("SELECT account_id FROM steam_links WHERE user_id = ?", (user_id,))
             result = await cursor.fetchone()
-            return result[0] if result else None
+
+        account_id = result[0] if result else None
+        self._cache_account(user_id, account_id)
+        return account_id
+
+    def _cache_account(self, user_id: int, account_id: Optional[int]) -> None:
+        """Кладёт привязку в кэш на ACCOUNT_CACHE_TTL секунд."""
+        if user_id not in self._account_cache and len(self._account_cache) >= self.ACCOUNT_CACHE_SIZE:
+            # dict хранит порядок вставки — первый ключ самый старый
+            self._account_cache.pop(next(iter(self._account_cache)))
+        self._account_cache[user_id] = (time.monotonic() + self.ACCOUNT_CACHE_TTL, account_id)
 
     async def get_all_linked(self) -> List[Tuple[int, int, str]]:
         """Возвращает всех привязанных: (user_id, account_id, persona_name)."""
-        async with self.db.connection() as conn:
+        async with self.db.read_connection() as conn:
             cursor = await conn.execute("SELECT user_id, account_id, persona_name FROM steam_links")
-            results = await cursor.fetchall()
-            return [(r[0], r[1], r[2]) for r in results]
+            # Без Row-фабрики sqlite3 сразу отдаёт обычные кортежи
+            cursor.row_factory = None
+            return await cursor.fetchall()
 
     # ═══════════════════════════════════════════════════════════
     # 🔔 SHAME SUBSCRIPTIONS
@@ -105,7 +135,7 @@ class SteamLinkRepository:
                 INSERT OR REPLACE INTO shame_subscriptions (user_id, chat_id, subscribed_at)
                 VALUES (?, ?, ?)
             """,
-                (user_id, chat_id, datetime.now().isoformat()),
+                (user_id, chat_id, int(time.time())),
             )
             return True
 
@@ -119,15 +149,37 @@ class SteamLinkRepository:
 
     async def is_shame_subscribed(self, user_id: int, chat_id: int) -> bool:
         """Проверяет подписку."""
-        async with self.db.connection() as conn:
+        async with self.db.read_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT EXISTS(SELECT 1 FROM shame_subscriptions WHERE user_id = ? AND chat_id = ?)", (user_id, chat_id)
+            )
+            return bool((await cursor.fetchone())[0])
+
+    async def get_dota_status(self, user_id: int, chat_id: int) -> Tuple[Optional[int], bool]:
+        """Возвращает (account_id или None, подписан ли на shame в чате) одним запросом.
+
+        Подписка без привязки Steam не учитывается — shame без аккаунта не работает.
+        """
+        async with self.db.read_connection() as conn:
             cursor = await conn.execute(
-                "SELECT 1 FROM shame_subscriptions WHERE user_id = ? AND chat_id = ?", (user_id, chat_id)
+                """
+                SELECT l.account_id,
+                       EXISTS(SELECT 1 FROM shame_subscriptions s WHERE s.user_id = l.user_id AND s.chat_id = ?)
+                FROM steam_links l
+                WHERE l.user_id = ?
+            """,
+                (chat_id, user_id),
             )
-            return await cursor.fetchone() is not None
+            result = await cursor.fetchone()
+
+        account_id, is_subscribed = (result[0], bool(result[1])) if result else (None, False)
+        # Следующие Dota-кнопки спросят привязку — заодно прогреваем кэш
+        self._cache_account(user_id, account_id)
+        return account_id, is_subscribed
 
     async def get_shame_subscribers(self, chat_id: int) -> List[Tuple[int, int, Optional[int]]]:
         """Возвращает подписчиков чата: (user_id, account_id, last_match_id)."""
-        async with self.db.connection() as conn:
+        async with self.db.read_connection() as conn:
             cursor = await conn.execute(
                 """
                 SELECT s.user_id, l.account_id, s.last_match_id
@@ -137,12 +189,29 @@ class SteamLinkRepository:
             """,
                 (chat_id,),
             )
+            # Без Row-фабрики sqlite3 сразу отдаёт обычные кортежи
+            cursor.row_factory = None
+            return await cursor.fetchall()
+
+    async def get_all_shame_subscribers(self) -> Dict[int, List[Tuple[int, int, Optional[int]]]]:
+        """Возвращает подписчиков всех чатов одним запросом: chat_id -> [(user_id, account_id, last_match_id)]."""
+        async with self.db.read_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT s.chat_id, s.user_id, l.account_id, s.last_match_id
+                FROM shame_subscriptions s
+                JOIN steam_links l ON s.user_id = l.user_id
+            """)
+            cursor.row_factory = None
             results = await cursor.fetchall()
-            return [(r[0], r[1], r[2]) for r in results]
+
+        subscribers: Dict[int, List[Tuple[int, int, Optional[int]]]] = defaultdict(list)
+        for chat_id, user_id, account_id, last_match_id in results:
+            subscribers[chat_id].append((user_id, account_id, last_match_id))
+        return dict(subscribers)
 
     async def get_all_shame_chats(self) -> List[int]:
         """Возвращает все чаты с подписчиками."""
-        async with self.db.connection() as conn:
+        async with self.db.read_connection() as conn:
             cursor = await conn.execute("SELECT DISTINCT chat_id FROM shame_subscriptions")
             results = await cursor.fetchall()
             return [r[0] for r in results]
@@ -154,3 +223,12 @@ class SteamLinkRepository:
                 "UPDATE shame_subscriptions SET last_match_id = ? WHERE user_id = ? AND chat_id = ?",
                 (match_id, user_id, chat_id),
             )
+
+    async def update_last_matches(self, rows: Iterable[Tuple[int, int, int]]) -> None:
+        """Обновляет последний обработанный матч для нескольких подписок: (user_id, chat_id, match_id)."""
+        # Все обновления в одной транзакции — один коммит вместо коммита на каждую подписку
+        async with self.db.connection() as conn:
+            await conn.executemany(
+                "UPDATE shame_subscriptions SET last_match_id = ? WHERE user_id = ? AND chat_id = ?",
+                [(match_id, user_id, chat_id) for user_id, chat_id, match_id in rows],
+            )
@@ -3,6 +3,7 @@
 """
 
 from enum import Enum
+from types import MappingProxyType
 
 
 class SpamType(Enum):
@@ -20,14 +21,18 @@ class SpamType(Enum):
     @property
     def display_name(self) -> str:
         """Человекочитаемое название."""
-        names = {
-            self.STICKER: "стикеров",
-            self.ANIMATION: "гифок",
-            self.TEXT: "одинаковых сообщений",
-            self.PHOTO: "одинаковых картинок",
-            self.VIDEO: "одинаковых видео",
-        }
-        return names[self]
+        return _SPAM_DISPLAY_NAMES[self]
+
+
+_SPAM_DISPLAY_NAMES = MappingProxyType(
+    {
+        SpamType.STICKER: "стикеров",
+        SpamType.ANIMATION: "гифок",
+        SpamType.TEXT: "одинаковых сообщений",
+        SpamType.PHOTO: "одинаковых картинок",
+        SpamType.VIDEO: "одинаковых видео",
+    }
+)
 
 
 class BanLevel(Enum):
@@ -42,30 +47,27 @@ class BanLevel(Enum):
     @property
     def duration_minutes(self) -> int:
         """Длительность бана в минутах."""
-        durations = {
-            self.FIRST: 10,
-            self.SECOND: 60,
-            self.THIRD: 300,
-            self.FOURTH: 1440,
-            self.PERMANENT: 2880,
-        }
-        return durations[self]
+        return _BAN_DURATIONS[self.value - 1]
 
     @classmethod
     def from_violation_count(cls, count: int) -> "BanLevel":
         """Определяет уровень бана по количеству нарушений."""
-        if count <= 0:
-            return cls.FIRST
-        elif count == 1:
-            return cls.FIRST
-        elif count == 2:
-            return cls.SECOND
-        elif count == 3:
-            return cls.THIRD
-        elif count == 4:
-            return cls.FOURTH
-        else:
-            return cls.PERMANENT
+        return _BAN_LEVELS_BY_COUNT[min(max(count, 0), 5)]
+
+
+# Таблицы вынесены из тела Enum, иначе они стали бы его членами.
+# Длительность по BanLevel.value - 1
+_BAN_DURATIONS = (10, 60, 300, 1440, 2880)
+
+# Уровень по количеству нарушений (0..5, всё что выше — PERMANENT)
+_BAN_LEVELS_BY_COUNT = (
+    BanLevel.FIRST,
+    BanLevel.FIRST,
+    BanLevel.SECOND,
+    BanLevel.THIRD,
+    BanLevel.FOURTH,
+    BanLevel.PERMANENT,
+)
 
 
 class ChatType(Enum):
@@ -7,12 +7,30 @@
 - Type hints везде
 """
 
+import time
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime
+from operator import attrgetter
+from types import MappingProxyType
 from typing import Optional
 
 from .enums import BanLevel, SpamType
 
+# Смещение 64-битного Steam ID относительно Account ID
+_STEAM_ID64_BASE = 76561197960265728
+
+# Тип спама -> геттер (limit, window) из ChatSettings. Собирается один раз при импорте
+_LIMIT_GETTERS = MappingProxyType(
+    {
+        SpamType.STICKER: attrgetter("sticker_limit", "sticker_window"),
+        SpamType.ANIMATION: attrgetter("sticker_limit", "sticker_window"),
+        SpamType.TEXT: attrgetter("text_limit", "text_window"),
+        SpamType.PHOTO: attrgetter("image_limit", "image_window"),
+        SpamType.VIDEO: attrgetter("video_limit", "video_window"),
+    }
+)
+
 
 @dataclass(frozen=True, slots=True)
 class User:
@@ -44,11 +62,23 @@ class SpamRecord:
     spam_type: SpamType
     timestamp: datetime
     content_hash: Optional[str] = None
+    # Тот же момент в Unix epoch — проверка окна сводится к вычитанию чисел
+    timestamp_epoch: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "timestamp_epoch", self.timestamp.timestamp())
 
     def is_recent(self, window_seconds: int) -> bool:
         """Проверяет, попадает ли запись в временное окно."""
-        delta = datetime.now() - self.timestamp
-        return delta.total_seconds() <= window_seconds
+        return self.is_recent_epoch(time.time(), window_seconds)
+
+    def is_recent_epoch(self, now_epoch: float, window_seconds: int) -> bool:
+        """То же, что is_recent, но с заранее взятым временем — для проверки многих записей."""
+        return now_epoch - self.timestamp_epoch <= window_seconds
+
+    def is_recent_at(self, now: datetime, window_seconds: int) -> bool:
+        """То же, что is_recent, относительно переданного момента now."""
+        return self.is_recent_epoch(now.timestamp(), window_seconds)
 
 
 @dataclass(frozen=True, slots=True)
@@ -60,26 +90,31 @@ class BanInfo:
     violation_count: int
     banned_until: Optional[datetime]
     last_violation: Optional[datetime] = None
+    # Уровень бана зависит только от violation_count — считаем один раз при создании
+    ban_level: BanLevel = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "ban_level", BanLevel.from_violation_count(self.violation_count))
+
+    def _remaining_seconds(self, now: datetime) -> float:
+        """Секунды до конца бана относительно now; 0 если бана нет или он истёк."""
+        if not self.banned_until or self.banned_until <= now:
+            return 0.0
+        return (self.banned_until - now).total_seconds()
+
+    def is_active_at(self, now: datetime) -> bool:
+        """Активен ли бан в момент now — для проверки многих банов с одним обращением к часам."""
+        return self._remaining_seconds(now) > 0
 
     @property
     def is_active(self) -> bool:
         """Активен ли бан сейчас."""
-        if not self.banned_until:
-            return False
-        return self.banned_until > datetime.now()
+        return self.is_active_at(datetime.now())
 
     @property
     def remaining_minutes(self) -> int:
         """Оставшееся время бана в минутах."""
-        if not self.is_active:
-            return 0
-        delta = self.banned_until - datetime.now()
-        return max(0, int(delta.total_seconds() / 60))
-
-    @property
-    def ban_level(self) -> BanLevel:
-        """Уровень бана."""
-        return BanLevel.from_violation_count(self.violation_count)
+        return int(self._remaining_seconds(datetime.now()) // 60)
 
 
 @dataclass(frozen=True, slots=True)
@@ -121,14 +156,7 @@ class ChatSettings:
 
     def get_limits(self, spam_type: SpamType) -> tuple[int, int]:
         """Возвращает (limit, window) для типа спама."""
-        limits_map = {
-            SpamType.STICKER: (self.sticker_limit, self.sticker_window),
-            SpamType.ANIMATION: (self.sticker_limit, self.sticker_window),
-            SpamType.TEXT: (self.text_limit, self.text_window),
-            SpamType.PHOTO: (self.image_limit, self.image_window),
-            SpamType.VIDEO: (self.video_limit, self.video_window),
-        }
-        return limits_map[spam_type]
+        return _LIMIT_GETTERS[spam_type](self)
 
 
 @dataclass(frozen=True, slots=True)
@@ -139,16 +167,13 @@ class SteamLink:
     account_id: int
     persona_name: Optional[str] = None
     linked_at: Optional[datetime] = None
+    # Производные ID считаются один раз при создании
+    steam_id_32: int = field(init=False, repr=False, compare=False)  # 32-битный Steam ID (Account ID)
+    steam_id_64: int = field(init=False, repr=False, compare=False)  # 64-битный Steam ID
 
-    @property
-    def steam_id_32(self) -> int:
-        """32-битный Steam ID (Account ID)."""
-        return self.account_id
-
-    @property
-    def steam_id_64(self) -> int:
-        """64-битный Steam ID."""
-        return self.account_id + 76561197960265728
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "steam_id_32", self.account_id)
+        object.__setattr__(self, "steam_id_64", self.account_id + _STEAM_ID64_BASE)
 
 
 @dataclass(frozen=True, slots=True)
@@ -168,10 +193,15 @@ class BanStatistics:
     chat_id: int
     period_days: int
     total_bans: int = 0
-    by_type: dict[str, int] = field(default_factory=dict)
+    by_type: Counter[str] = field(default_factory=Counter)
     top_violators: list[tuple[int, int]] = field(default_factory=list)
     total_ban_minutes: int = 0
 
+    def __post_init__(self) -> None:
+        # Принимаем и обычный dict (например, из BanStatsRepository.get_stats)
+        if not isinstance(self.by_type, Counter):
+            self.by_type = Counter(self.by_type)
+
     @property
     def average_ban_duration(self) -> float:
         """Средняя длительность бана."""
@@ -182,6 +212,5 @@ class BanStatistics:
     @property
     def most_common_type(self) -> Optional[str]:
         """Самый частый тип нарушения."""
-        if not self.by_type:
-            return None
-        return max(self.by_type.items(), key=lambda x: x[1])[0]
+        top = self.by_type.most_common(1)
+        return top[0][0] if top else None
@@ -6,8 +6,8 @@
 """
 
 import logging
-
-from telegram.ext import Application
+from functools import partial
+from typing import TYPE_CHECKING, NamedTuple
 
 from src.container import ServiceContainer
 from src.core.config import config
@@ -20,15 +20,21 @@ from src.database import (
     ViolationRepository,
     WhitelistRepository,
 )
-from src.services import (
-    AdminService,
-    BanService,
-    DatabaseCleanupService,
-    DotaService,
-    OpenDotaService,
-    ShameService,
-    SpamDetector,
-)
+
+# Сервисы и telegram импортируются внутри фабрик: модуль можно импортировать
+# ради одной фабрики (например, DatabaseFactory) без загрузки всего стека бота
+if TYPE_CHECKING:
+    from telegram.ext import Application
+
+    from src.services import (
+        AdminService,
+        BanService,
+        DatabaseCleanupService,
+        DotaService,
+        OpenDotaService,
+        ShameService,
+        SpamDetector,
+    )
 
 logger = logging.getLogger(__name__)
 
@@ -53,11 +59,22 @@ class DatabaseFactory:
         return db
 
 
+class Repositories(NamedTuple):
+    """Набор всех репозиториев."""
+
+    spam: SpamRepository
+    violation: ViolationRepository
+    whitelist: WhitelistRepository
+    settings: ChatSettingsRepository
+    stats: BanStatsRepository
+    steam: SteamLinkRepository
+
+
 class RepositoryFactory:
     """Фабрика для создания репозиториев."""
 
     @staticmethod
-    def create_all(db: Database) -> dict:
+    def create_all(db: Database) -> Repositories:
         """
         Создает все репозитории.
 
@@ -65,16 +82,16 @@ class RepositoryFactory:
             db: Экземпляр базы данных
 
         Returns:
-            Словарь с репозиториями
+            Repositories с репозиториями
         """
-        repos = {
-            "spam": SpamRepository(db),
-            "violation": ViolationRepository(db),
-            "whitelist": WhitelistRepository(db),
-            "settings": ChatSettingsRepository(db),
-            "stats": BanStatsRepository(db),
-            "steam": SteamLinkRepository(db),
-        }
+        repos = Repositories(
+            spam=SpamRepository(db),
+            violation=ViolationRepository(db),
+            whitelist=WhitelistRepository(db),
+            settings=ChatSettingsRepository(db),
+            stats=BanStatsRepository(db),
+            steam=SteamLinkRepository(db),
+        )
         logger.info(f"✅ Created {len(repos)} repositories")
         return repos
 
@@ -85,30 +102,40 @@ class ServiceFactory:
     @staticmethod
     def create_spam_detector(
         spam_repo: SpamRepository, whitelist_repo: WhitelistRepository, settings_repo: ChatSettingsRepository
-    ) -> SpamDetector:
+    ) -> "SpamDetector":
         """Создает SpamDetector с зависимостями."""
+        from src.services import SpamDetector
+
         return SpamDetector(spam_repo, whitelist_repo, settings_repo)
 
     @staticmethod
     def create_ban_service(
         violation_repo: ViolationRepository, spam_repo: SpamRepository, stats_repo: BanStatsRepository
-    ) -> BanService:
+    ) -> "BanService":
         """Создает BanService с зависимостями."""
+        from src.services import BanService
+
         return BanService(violation_repo, spam_repo, stats_repo)
 
     @staticmethod
-    def create_admin_service(admin_file: str) -> AdminService:
+    def create_admin_service(admin_file: str) -> "AdminService":
         """Создает AdminService."""
+        from src.services import AdminService
+
         return AdminService(admin_file)
 
     @staticmethod
-    def create_dota_service(users_file: str) -> DotaService:
+    def create_dota_service(users_file: str) -> "DotaService":
         """Создает DotaService."""
+        from src.services import DotaService
+
         return DotaService(users_file)
 
     @staticmethod
-    async def create_opendota_service() -> OpenDotaService:
+    async def create_opendota_service() -> "OpenDotaService":
         """Создает и инициализирует OpenDotaService."""
+        from src.services import OpenDotaService
+
         service = OpenDotaService(steam_api_key=config.steam_api_key)
         await service.init()
         logger.info("✅ OpenDotaService initialized")
@@ -120,21 +147,50 @@ class ServiceFactory:
 
     @staticmethod
     def create_shame_service(
-        opendota: OpenDotaService, steam_repo: SteamLinkRepository, application: Application
-    ) -> ShameService:
+        opendota: "OpenDotaService", steam_repo: SteamLinkRepository, application: "Application"
+    ) -> "ShameService":
         """Создает ShameService с зависимостями."""
+        from src.services import ShameService
+
         return ShameService(opendota, steam_repo, application)
 
     @staticmethod
     def create_cleanup_service(
         spam_repo: SpamRepository, interval_hours: int = 1, retention_hours: int = 24
-    ) -> DatabaseCleanupService:
+    ) -> "DatabaseCleanupService":
         """Создает DatabaseCleanupService."""
+        from src.services import DatabaseCleanupService
+
         return DatabaseCleanupService(
             spam_repo=spam_repo, interval_hours=interval_hours, retention_hours=retention_hours
         )
 
 
+# Фабрики сервисов для контейнера. Регистрируются через partial — без замыканий на container
+def _make_spam_detector(container: ServiceContainer) -> "SpamDetector":
+    return ServiceFactory.create_spam_detector(
+        container.get(SpamRepository), container.get(WhitelistRepository), container.get(ChatSettingsRepository)
+    )
+
+
+def _make_ban_service(container: ServiceContainer) -> "BanService":
+    return ServiceFactory.create_ban_service(
+        container.get(ViolationRepository), container.get(SpamRepository), container.get(BanStatsRepository)
+    )
+
+
+def _make_shame_service(container: ServiceContainer, application: "Application") -> "ShameService":
+    from src.services import OpenDotaService
+
+    return ServiceFactory.create_shame_service(
+        container.get(OpenDotaService), container.get(SteamLinkRepository), application
+    )
+
+
+def _make_cleanup_service(container: ServiceContainer) -> "DatabaseCleanupService":
+    return ServiceFactory.create_cleanup_service(container.get(SpamRepository), interval_hours=1, retention_hours=24)
+
+
 class ContainerFactory:
     """Фабрика для настройки DI контейнера."""
 
@@ -147,6 +203,7 @@ class ContainerFactory:
             Настроенный ServiceContainer
         """
         from src.container import ServiceLifetime
+        from src.services import AdminService, BanService, DotaService, OpenDotaService, SpamDetector
 
         container = ServiceContainer()
 
@@ -156,51 +213,36 @@ class ContainerFactory:
 
         # 2. Репозитории (singleton)
         repos = RepositoryFactory.create_all(db)
-        container.register_instance(SpamRepository, repos["spam"])
-        container.register_instance(ViolationRepository, repos["violation"])
-        container.register_instance(WhitelistRepository, repos["whitelist"])
-        container.register_instance(ChatSettingsRepository, repos["settings"])
-        container.register_instance(BanStatsRepository, repos["stats"])
+        container.register_instance(SpamRepository, repos.spam)
+        container.register_instance(ViolationRepository, repos.violation)
+        container.register_instance(WhitelistRepository, repos.whitelist)
+        container.register_instance(ChatSettingsRepository, repos.settings)
+        container.register_instance(BanStatsRepository, repos.stats)
 
         # Инициализируем таблицу Steam
-        await repos["steam"].init_table()
-        container.register_instance(SteamLinkRepository, repos["steam"])
+        await repos.steam.init_table()
+        container.register_instance(SteamLinkRepository, repos.steam)
 
         # 3. Сервисы (singleton)
+        container.register(SpamDetector, partial(_make_spam_detector, container), ServiceLifetime.SINGLETON)
+        container.register(BanService, partial(_make_ban_service, container), ServiceLifetime.SINGLETON)
         container.register(
-            SpamDetector,
-            lambda: ServiceFactory.create_spam_detector(
-                container.get(SpamRepository), container.get(WhitelistRepository), container.get(ChatSettingsRepository)
-            ),
-            ServiceLifetime.SINGLETON,
-        )
-
-        container.register(
-            BanService,
-            lambda: ServiceFactory.create_ban_service(
-                container.get(ViolationRepository), container.get(SpamRepository), container.get(BanStatsRepository)
-            ),
-            ServiceLifetime.SINGLETON,
-        )
-
-        container.register(
-            AdminService, lambda: ServiceFactory.create_admin_service(config.files.admins), ServiceLifetime.SINGLETON
+            AdminService, partial(ServiceFactory.create_admin_service, config.files.admins), ServiceLifetime.SINGLETON
         )
-
         container.register(
-            DotaService, lambda: ServiceFactory.create_dota_service(config.files.dota_users), ServiceLifetime.SINGLETON
+            DotaService, partial(ServiceFactory.create_dota_service, config.files.dota_users), ServiceLifetime.SINGLETON
         )
 
         # OpenDotaService требует async init
         opendota = await ServiceFactory.create_opendota_service()
         container.register_instance(OpenDotaService, opendota)
 
-        logger.info(f"✅ DI Container configured with {len(container.get_registered_services())} services")
+        logger.info("✅ DI Container configured with %d services", container.service_count)
 
         return container
 
     @staticmethod
-    def register_application_services(container: ServiceContainer, application: Application) -> None:
+    def register_application_services(container: ServiceContainer, application: "Application") -> None:
         """
         Регистрирует сервисы, которые зависят от Application.
 
@@ -211,23 +253,14 @@ class ContainerFactory:
             application: Telegram Application
         """
         from src.container import ServiceLifetime
+        from src.services import DatabaseCleanupService, ShameService
 
         # ShameService зависит от Application
         container.register(
-            ShameService,
-            lambda: ServiceFactory.create_shame_service(
-                container.get(OpenDotaService), container.get(SteamLinkRepository), application
-            ),
-            ServiceLifetime.SINGLETON,
+            ShameService, partial(_make_shame_service, container, application), ServiceLifetime.SINGLETON
         )
 
         # DatabaseCleanupService
-        container.register(
-            DatabaseCleanupService,
-            lambda: ServiceFactory.create_cleanup_service(
-                container.get(SpamRepository), interval_hours=1, retention_hours=24
-            ),
-            ServiceLifetime.SINGLETON,
-        )
+        container.register(DatabaseCleanupService, partial(_make_cleanup_service, container), ServiceLifetime.SINGLETON)
 
         logger.info("✅ Application-dependent services registered")
@@ -1,6 +1,39 @@
-from .dota import DotaHandlers
+"""
+Обработчики Telegram.
+
+DotaHandlers импортируется лениво (PEP 562): `from src.handlers import MenuHandlers`
+не загружает модуль dota и его зависимости.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from .menu import MenuHandlers
 from .moderation import ModerationHandlers
 from .spam import register_spam_handlers
 
+if TYPE_CHECKING:
+    from .dota import DotaHandlers
+
+# Имя -> модуль, из которого оно импортируется при первом обращении
+_LAZY = {
+    "DotaHandlers": ".dota",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Кэшируем в модуле, чтобы следующие обращения не шли через __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + list(_LAZY))
+
+
 __all__ = ["register_spam_handlers", "MenuHandlers", "ModerationHandlers", "DotaHandlers"]
@@ -2,16 +2,173 @@
 Обработчики команд для Dota 2.
 """
 
+import asyncio
+import heapq
+import html
 import logging
-
-from telegram import Update
+import re
+from operator import attrgetter, itemgetter
+from types import MappingProxyType
+from typing import Set
+
+from telegram import Message, Update
+from telegram.constants import ParseMode
+from telegram.error import TelegramError
 from telegram.ext import ContextTypes
 
 from src.database.steam_repository import SteamLinkRepository
 from src.services.opendota_service import OpenDotaService
+from src.ui.dota_format import MEDALS, TOXIC_WORDS, fmt, rank_emoji, toxic_rating
 
 logger = logging.getLogger(__name__)
 
+# Steam-ссылка во вводе /link; группа 1 есть только у кастомного URL (steamcommunity.com/id/...)
+_STEAM_URL_RE = re.compile(r"steamcommunity\.com(/id/)?", re.IGNORECASE)
+
+# Справка по форматам статична — собираем тексты /link один раз при импорте
+_SUPPORTED_FORMATS = OpenDotaService.get_supported_formats()
+
+_LINK_HELP_TEXT = (
+    "🎮 *Как привязать Steam:*\n\n"
+    "Просто скопируй ссылку на свой профиль и отправь:\n"
+    "`/link <ссылка или ID>`\n\n"
+    f"{_SUPPORTED_FORMATS}\n"
+    "📌 *Примеры:*\n"
+    "• `/link 123456789`\n"
+    "• `/link https://dotabuff.com/players/123456789`\n"
+    "• `/link https://steamcommunity.com/id/nickname`"
+)
+
+_LINK_ERROR_TEXT = f"❌ *Не удалось распознать ID*\n\n{_SUPPORTED_FORMATS}"
+_LINK_ERROR_CUSTOM_URL_TEXT = (
+    "❌ *Не удалось распознать ID*\n\n"
+    "💡 *Кастомный Steam URL не найден.*\n"
+    "Попробуй:\n"
+    "• Использовать числовой Steam ID\n"
+    "• Скопировать ссылку с Dotabuff/OpenDota\n\n"
+    f"{_SUPPORTED_FORMATS}"
+)
+_LINK_ERROR_STEAM_URL_TEXT = (
+    "❌ *Не удалось распознать ID*\n\n"
+    "💡 Убедись что ссылка содержит `/profiles/` или `/id/`\n\n"
+    f"{_SUPPORTED_FORMATS}"
+)
+
+# Шаблоны ответов: статичная часть разбирается один раз, в обработчиках подставляются только поля
+_PROFILE_NOT_FOUND_MD = (
+    "❌ *Профиль не найден на OpenDota*\n\n"
+    "🆔 Распознанный ID: `{account_id}`\n\n"
+    "Убедись что:\n"
+    "• ID правильный\n"
+    "• Профиль публичный в Steam\n"
+    '• Включено "Expose Public Match Data" в Dota 2\n'
+    "• Была хотя бы 1 игра\n\n"
+    "🔗 Проверь профиль: [OpenDota](https://www.opendota.com/players/{account_id})"
+)
+
+# Ответы с именами из Telegram/Steam и словами из чата — в HTML: такие поля экранируются через html.escape,
+# а в Markdown ник с "_" или "*" ломает разметку и Telegram отвечает 400
+_ALREADY_LINKED_HTML = (
+    "❌ <b>Этот Steam аккаунт уже привязан к другому пользователю</b>\n\n"
+    "👤 {persona_name}\n"
+    "🆔 <code>{account_id}</code>\n\n"
+    "Каждый Steam аккаунт может быть привязан только к одному Telegram пользователю.\n\n"
+    "Если это твой аккаунт и он привязан к другому Telegram, "
+    "попроси администратора помочь с отвязкой."
+)
+
+_LINKED_HTML = (
+    "✅ <b>Привязано!</b>\n\n"
+    "👤 {persona_name}\n"
+    "🏅 {rank_name}\n"
+    "🆔 <code>{account_id}</code>\n\n"
+    '🔗 <a href="https://www.opendota.com/players/{account_id}">OpenDota</a> | '
+    '<a href="https://www.dotabuff.com/players/{account_id}">Dotabuff</a>\n\n'
+    "Теперь можно юзать /game, /lastgame, /last, /toxic"
+)
+
+_LIVE_GAME_HTML = (
+    "🎮 <b>{name} в игре!</b>\n\n⏱ <b>{time_str}</b> минута\n🦸 {hero}\n⚔️ {team}\n🎯 {game_mode}\n{mmr_text}"
+)
+
+_NOT_IN_GAME_HTML = "😴 <b>{name}</b> сейчас не в игре\n\n<i>Или матч не отслеживается OpenDota</i>"
+
+_LAST_GAME_HTML = (
+    "🎮 <b>Последний матч {name}:</b>\n\n"
+    "{result}\n"
+    "🦸 {hero}\n"
+    "⚔️ KDA: <b>{kda}</b>\n"
+    "⏱ {duration} мин\n"
+    "🎯 {game_mode}\n\n"
+    '🔗 <a href="https://www.opendota.com/matches/{match_id}">OpenDota</a>'
+)
+
+_PROFILE_HTML = (
+    "👤 <b>{persona_name}</b>\n\n"
+    "🏅 {rank_name}\n"
+    "{mmr_text}\n\n"
+    '🔗 <a href="https://www.opendota.com/players/{account_id}">OpenDota</a> | '
+    '<a href="https://www.dotabuff.com/players/{account_id}">Dotabuff</a>'
+)
+
+_LAST_MATCH_HTML = (
+    "📊 <b>Последний матч {name}</b>\n\n"
+    "{result} • {hero}\n"
+    "⏱ {duration} мин\n\n"
+    "⚔️ <b>KDA:</b> {kda}\n"
+    "💰 <b>GPM:</b> {gpm} {gpm_rank}\n"
+    "📈 <b>XPM:</b> {xpm}\n\n"
+    "🗡 <b>Урон героям:</b> {hero_damage} {hero_dmg_rank}\n"
+    "🏰 <b>Урон вышкам:</b> {tower_damage} {tower_dmg_rank}\n\n"
+    "🌾 <b>LH/DN:</b> {last_hits}/{denies}\n"
+    "💎 <b>Net Worth:</b> {net_worth}\n"
+)
+
+_TOXIC_SAINT_HTML = "😇 <b>{name}</b> — святой человек!\n\n<i>Либо не пишет в чат, либо данных нет</i>"
+
+_SHAME_STATUS_MD = (
+    "🔔 *Уведомления о позоре:* {status}\n\n"
+    "Используй:\n"
+    "`/shame on` — включить\n"
+    "`/shame off` — выключить\n\n"
+    "_После каждой катки бот найдёт самого бесполезного и опозорит его в чате_ 😈"
+)
+
+_SHAME_ON_MD = (
+    "✅ *Подписка активирована!*\n\n"
+    "Теперь после каждой катки бот определит "
+    "самого бесполезного игрока и опозорит его 😈\n\n"
+    "_Проверка происходит каждые 2 минуты_"
+)
+_SHAME_OFF_MD = "❌ *Подписка отключена*\n\nБольше никакого позора... пока что 👀"
+_SHAME_USAGE_MD = "❓ Используй `/shame on` или `/shame off`"
+
+# Аргумент /shame -> (геттер метода SteamLinkRepository, ответ)
+_SHAME_ACTIONS = MappingProxyType(
+    {
+        "on": (attrgetter("subscribe_shame"), _SHAME_ON_MD),
+        "off": (attrgetter("unsubscribe_shame"), _SHAME_OFF_MD),
+    }
+)
+
+# Ссылки на фоновые задачи: event loop держит задачи только по слабой ссылке
+_background_tasks: Set["asyncio.Task[None]"] = set()
+
+
+async def _safe_delete(message: Message) -> None:
+    """Удаляет сообщение, игнорируя ошибки (нет прав, уже удалено)."""
+    try:
+        await message.delete()
+    except TelegramError as e:
+        logger.debug(f"Failed to delete message {message.message_id}: {type(e).__name__}")
+
+
+def _delete_later(message: Message) -> None:
+    """Удаляет сообщение в фоне, не задерживая обработчик на запрос к Telegram."""
+    task = asyncio.create_task(_safe_delete(message))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
 
 class DotaHandlers:
     """Обработчики Dota команд."""
@@ -29,70 +186,45 @@ class DotaHandlers:
         user_id = update.effective_user.id
 
         # Удаляем команду чтобы ID не светился в чате
-        try:
-            await update.message.delete()
-        except Exception:
-            pass
+        _delete_later(update.message)
 
         if not context.args:
             # Отправляем приватно с подробной инструкцией
-            await context.bot.send_message(
-                chat_id=user_id,
-                text=(
-                    "🎮 *Как привязать Steam:*\n\n"
-                    "Просто скопируй ссылку на свой профиль и отправь:\n"
-                    "`/link <ссылка или ID>`\n\n"
-                    f"{OpenDotaService.get_supported_formats()}\n"
-                    "📌 *Примеры:*\n"
-                    "• `/link 123456789`\n"
-                    "• `/link https://dotabuff.com/players/123456789`\n"
-                    "• `/link https://steamcommunity.com/id/nickname`"
-                ),
-                parse_mode="Markdown",
-            )
+            await context.bot.send_message(chat_id=user_id, text=_LINK_HELP_TEXT, parse_mode="Markdown")
             return
 
         # Собираем весь ввод (ссылка может содержать пробелы если скопирована криво)
         steam_input = " ".join(context.args)
+        steam_url = _STEAM_URL_RE.search(steam_input)
+        is_custom_url = steam_url is not None and steam_url.group(1) is not None
 
         # Показываем что обрабатываем (для кастомных URL может быть задержка)
         processing_msg = None
-        if "steamcommunity.com/id/" in steam_input.lower():
+        if is_custom_url:
             try:
                 processing_msg = await context.bot.send_message(
                     chat_id=user_id, text="🔍 Ищу профиль по кастомному URL..."
                 )
-            except Exception:
-                pass
+            except TelegramError as e:
+                logger.debug(f"Failed to send processing message to {user_id}: {type(e).__name__}")
 
         # Используем новый умный парсер
         account_id = await self.opendota.parse_account_id(steam_input)
 
         # Удаляем сообщение о поиске
         if processing_msg:
-            try:
-                await processing_msg.delete()
-            except Exception:
-                pass
+            _delete_later(processing_msg)
 
         if not account_id:
             # Определяем тип ошибки для более точной подсказки
-            error_hint = ""
-            if "steamcommunity.com/id/" in steam_input.lower():
-                error_hint = (
-                    "\n\n💡 *Кастомный Steam URL не найден.*\n"
-                    "Попробуй:\n"
-                    "• Использовать числовой Steam ID\n"
-                    "• Скопировать ссылку с Dotabuff/OpenDota"
-                )
-            elif "steamcommunity.com" in steam_input.lower():
-                error_hint = "\n\n💡 Убедись что ссылка содержит `/profiles/` или `/id/`"
+            if is_custom_url:
+                error_text = _LINK_ERROR_CUSTOM_URL_TEXT
+            elif steam_url is not None:
+                error_text = _LINK_ERROR_STEAM_URL_TEXT
+            else:
+                error_text = _LINK_ERROR_TEXT
 
-            await context.bot.send_message(
-                chat_id=user_id,
-                text=(f"❌ *Не удалось распознать ID*{error_hint}\n\n" f"{OpenDotaService.get_supported_formats()}"),
-                parse_mode="Markdown",
-            )
+            await context.bot.send_message(chat_id=user_id, text=error_text, parse_mode="Markdown")
             return
 
         # Проверяем что профиль существует
@@ -101,16 +233,7 @@ class DotaHandlers:
         if not profile:
             await context.bot.send_message(
                 chat_id=user_id,
-                text=(
-                    f"❌ *Профиль не найден на OpenDota*\n\n"
-                    f"🆔 Распознанный ID: `{account_id}`\n\n"
-                    "Убедись что:\n"
-                    "• ID правильный\n"
-                    "• Профиль публичный в Steam\n"
-                    '• Включено "Expose Public Match Data" в Dota 2\n'
-                    "• Была хотя бы 1 игра\n\n"
-                    "🔗 Проверь профиль: [OpenDota](https://www.opendota.com/players/{account_id})"
-                ),
+                text=_PROFILE_NOT_FOUND_MD.format(account_id=account_id),
                 parse_mode="Markdown",
             )
             return
@@ -121,57 +244,48 @@ class DotaHandlers:
         if not success:
             await context.bot.send_message(
                 chat_id=user_id,
-                text=(
-                    f"❌ *Этот Steam аккаунт уже привязан к другому пользователю*\n\n"
-                    f"👤 {profile.persona_name}\n"
-                    f"🆔 `{account_id}`\n\n"
-                    f"Каждый Steam аккаунт может быть привязан только к одному Telegram пользователю.\n\n"
-                    f"Если это твой аккаунт и он привязан к другому Telegram, "
-                    f"попроси администратора помочь с отвязкой."
-                ),
-                parse_mode="Markdown",
+                text=_ALREADY_LINKED_HTML.format(persona_name=html.escape(profile.persona_name), account_id=account_id),
+                parse_mode=ParseMode.HTML,
             )
             return
 
         await context.bot.send_message(
             chat_id=user_id,
-            text=(
-                f"✅ *Привязано!*\n\n"
-                f"👤 {profile.persona_name}\n"
-                f"🏅 {profile.rank_name}\n"
-                f"🆔 `{account_id}`\n\n"
-                f"🔗 [OpenDota](https://www.opendota.com/players/{account_id}) | "
-                f"[Dotabuff](https://www.dotabuff.com/players/{account_id})\n\n"
-                f"Теперь можно юзать /game, /lastgame, /last, /toxic"
+            text=_LINKED_HTML.format(
+                persona_name=html.escape(profile.persona_name), rank_name=profile.rank_name, account_id=account_id
             ),
-            parse_mode="Markdown",
+            parse_mode=ParseMode.HTML,
         )
 
     async def unlink_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """/unlink — отвязать Steam."""
+        message = update.message
         user_id = update.effective_user.id
 
         removed = await self.steam_repo.unlink(user_id)
 
         if removed:
-            await update.message.reply_text("✅ Steam отвязан!")
+            await message.reply_text("✅ Steam отвязан!")
         else:
-            await update.message.reply_text("ℹ️ У тебя и не было привязки")
+            await message.reply_text("ℹ️ У тебя и не было привязки")
 
     async def game_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
         /game [@user] — проверить в игре ли человек.
         Без аргумента — проверяет себя.
         """
+        message = update.message
+        user = update.effective_user
+
         # Определяем кого чекаем
-        if update.message.reply_to_message:
-            target_user = update.message.reply_to_message.from_user
+        if message.reply_to_message:
+            target_user = message.reply_to_message.from_user
         elif context.args and context.args[0].startswith("@"):
             # TODO: резолв по username — сложно без БД
-            await update.message.reply_text("💡 Лучше ответь на сообщение человека")
+            await message.reply_text("💡 Лучше ответь на сообщение человека")
             return
         else:
-            target_user = update.effective_user
+            target_user = user
 
         target_id = target_user.id
         target_name = target_user.first_name
@@ -180,44 +294,50 @@ class DotaHandlers:
         account_id = await self.steam_repo.get_account_id(target_id)
 
         if not account_id:
-            if target_id == update.effective_user.id:
-                await update.message.reply_text("❌ Сначала привяжи Steam!\n" "Напиши мне в ЛС: /link")
+            if target_id == user.id:
+                await message.reply_text("❌ Сначала привяжи Steam!\n" "Напиши мне в ЛС: /link")
             else:
-                await update.message.reply_text(f"❌ У {target_name} не привязан Steam")
+                await message.reply_text(f"❌ У {target_name} не привязан Steam")
             return
 
-        # Чекаем live игру
-        await update.message.reply_text(f"🔍 Чекаю {target_name}...")
-
-        live = await self.opendota.get_live_game(account_id)
+        # Чекаем live игру, пока отправляется сообщение о проверке
+        _, live = await asyncio.gather(
+            message.reply_text(f"🔍 Чекаю {target_name}..."),
+            self.opendota.get_live_game(account_id),
+        )
 
         if live:
             mmr_text = f"📊 ~{live.avg_mmr} MMR" if live.avg_mmr else ""
 
-            await update.message.reply_text(
-                f"🎮 *{target_name} в игре!*\n\n"
-                f"⏱ *{live.time_str}* минута\n"
-                f"🦸 {live.player_hero}\n"
-                f"⚔️ {live.player_team}\n"
-                f"🎯 {live.game_mode}\n"
-                f"{mmr_text}",
-                parse_mode="Markdown",
+            await message.reply_text(
+                _LIVE_GAME_HTML.format(
+                    name=html.escape(target_name),
+                    time_str=live.time_str,
+                    hero=live.player_hero,
+                    team=live.player_team,
+                    game_mode=live.game_mode,
+                    mmr_text=mmr_text,
+                ),
+                parse_mode=ParseMode.HTML,
             )
         else:
-            await update.message.reply_text(
-                f"😴 *{target_name}* сейчас не в игре\n\n" f"_Или матч не отслеживается OpenDota_",
-                parse_mode="Markdown",
+            await message.reply_text(
+                _NOT_IN_GAME_HTML.format(name=html.escape(target_name)),
+                parse_mode=ParseMode.HTML,
             )
 
     async def lastgame_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
         /lastgame [@user] — последний матч.
         """
+        message = update.message
+        user = update.effective_user
+
         # Определяем кого чекаем
-        if update.message.reply_to_message:
-            target_user = update.message.reply_to_message.from_user
+        if message.reply_to_message:
+            target_user = message.reply_to_message.from_user
         else:
-            target_user = update.effective_user
+            target_user = user
 
         target_id = target_user.id
         target_name = target_user.first_name
@@ -225,67 +345,74 @@ class DotaHandlers:
         account_id = await self.steam_repo.get_account_id(target_id)
 
         if not account_id:
-            if target_id == update.effective_user.id:
-                await update.message.reply_text("❌ Сначала привяжи Steam! /link")
+            if target_id == user.id:
+                await message.reply_text("❌ Сначала привяжи Steam! /link")
             else:
-                await update.message.reply_text(f"❌ У {target_name} не привязан Steam")
+                await message.reply_text(f"❌ У {target_name} не привязан Steam")
             return
 
         match = await self.opendota.get_last_match(account_id)
 
         if not match:
-            await update.message.reply_text("❌ Не удалось получить матч")
+            await message.reply_text("❌ Не удалось получить матч")
             return
 
         result = "✅ Победа" if match["win"] else "❌ Поражение"
         kda = f"{match['kills']}/{match['deaths']}/{match['assists']}"
 
-        await update.message.reply_text(
-            f"🎮 *Последний матч {target_name}:*\n\n"
-            f"{result}\n"
-            f"🦸 {match['hero']}\n"
-            f"⚔️ KDA: *{kda}*\n"
-            f"⏱ {match['duration']} мин\n"
-            f"🎯 {match['game_mode']}\n\n"
-            f"🔗 [OpenDota](https://www.opendota.com/matches/{match['match_id']})",
-            parse_mode="Markdown",
+        await message.reply_text(
+            _LAST_GAME_HTML.format(
+                name=html.escape(target_name),
+                result=result,
+                hero=match["hero"],
+                kda=kda,
+                duration=match["duration"],
+                game_mode=match["game_mode"],
+                match_id=match["match_id"],
+            ),
+            parse_mode=ParseMode.HTML,
         )
 
     async def profile_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """/profile — показать свой профиль."""
+        message = update.message
         user_id = update.effective_user.id
 
         account_id = await self.steam_repo.get_account_id(user_id)
 
         if not account_id:
-            await update.message.reply_text("❌ Сначала привяжи Steam! /link")
+            await message.reply_text("❌ Сначала привяжи Steam! /link")
             return
 
         profile = await self.opendota.get_profile(account_id)
 
         if not profile:
-            await update.message.reply_text("❌ Не удалось загрузить профиль")
+            await message.reply_text("❌ Не удалось загрузить профиль")
             return
 
         mmr_text = f"📈 ~{profile.mmr_estimate} MMR" if profile.mmr_estimate else ""
 
-        await update.message.reply_text(
-            f"👤 *{profile.persona_name}*\n\n"
-            f"🏅 {profile.rank_name}\n"
-            f"{mmr_text}\n\n"
-            f"🔗 [OpenDota](https://www.opendota.com/players/{account_id}) | "
-            f"[Dotabuff](https://www.dotabuff.com/players/{account_id})",
-            parse_mode="Markdown",
+        await message.reply_text(
+            _PROFILE_HTML.format(
+                persona_name=html.escape(profile.persona_name),
+                rank_name=profile.rank_name,
+                mmr_text=mmr_text,
+                account_id=account_id,
+            ),
+            parse_mode=ParseMode.HTML,
         )
 
     async def last_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
         /last [@user] — детальная стата последнего матча.
         """
-        if update.message.reply_to_message:
-            target_user = update.message.reply_to_message.from_user
+        message = update.message
+        user = update.effective_user
+
+        if message.reply_to_message:
+            target_user = message.reply_to_message.from_user
         else:
-            target_user = update.effective_user
+            target_user = user
 
         target_id = target_user.id
         target_name = target_user.first_name
@@ -293,50 +420,40 @@ class DotaHandlers:
         account_id = await self.steam_repo.get_account_id(target_id)
 
         if not account_id:
-            if target_id == update.effective_user.id:
-                await update.message.reply_text("❌ Сначала привяжи Steam! /link")
+            if target_id == user.id:
+                await message.reply_text("❌ Сначала привяжи Steam! /link")
             else:
-                await update.message.reply_text(f"❌ У {target_name} не привязан Steam")
+                await message.reply_text(f"❌ У {target_name} не привязан Steam")
             return
 
-        msg = await update.message.reply_text(f"🔍 Загружаю матч {target_name}...")
-
-        match = await self.opendota.get_match_details(account_id)
+        msg, match = await asyncio.gather(
+            message.reply_text(f"🔍 Загружаю матч {target_name}..."),
+            self.opendota.get_match_details(account_id),
+        )
 
         if not match:
             await msg.edit_text("❌ Не удалось получить данные матча")
             return
 
-        result = "✅ *ПОБЕДА*" if match["win"] else "❌ *ПОРАЖЕНИЕ*"
+        result = "✅ <b>ПОБЕДА</b>" if match["win"] else "❌ <b>ПОРАЖЕНИЕ</b>"
         kda = f"{match['kills']}/{match['deaths']}/{match['assists']}"
 
-        # Эмодзи для рангов в команде
-        def rank_emoji(rank):
-            if rank == 1:
-                return "🥇"
-            elif rank == 2:
-                return "🥈"
-            elif rank == 3:
-                return "🥉"
-            return f"#{rank}"
-
-        # Форматируем числа
-        def fmt(n):
-            if n >= 1000:
-                return f"{n / 1000:.1f}k"
-            return str(n)
-
-        text = (
-            f"📊 *Последний матч {target_name}*\n\n"
-            f"{result} • {match['hero']}\n"
-            f"⏱ {match['duration']} мин\n\n"
-            f"⚔️ *KDA:* {kda}\n"
-            f"💰 *GPM:* {match['gpm']} {rank_emoji(match['gpm_rank'])}\n"
-            f"📈 *XPM:* {match['xpm']}\n\n"
-            f"🗡 *Урон героям:* {fmt(match['hero_damage'])} {rank_emoji(match['hero_dmg_rank'])}\n"
-            f"🏰 *Урон вышкам:* {fmt(match['tower_damage'])} {rank_emoji(match['tower_dmg_rank'])}\n\n"
-            f"🌾 *LH/DN:* {match['last_hits']}/{match['denies']}\n"
-            f"💎 *Net Worth:* {fmt(match['net_worth'])}\n"
+        text = _LAST_MATCH_HTML.format(
+            name=html.escape(target_name),
+            result=result,
+            hero=match["hero"],
+            duration=match["duration"],
+            kda=kda,
+            gpm=match["gpm"],
+            gpm_rank=rank_emoji(match["gpm_rank"]),
+            xpm=match["xpm"],
+            hero_damage=fmt(match["hero_damage"]),
+            hero_dmg_rank=rank_emoji(match["hero_dmg_rank"]),
+            tower_damage=fmt(match["tower_damage"]),
+            tower_dmg_rank=rank_emoji(match["tower_dmg_rank"]),
+            last_hits=match["last_hits"],
+            denies=match["denies"],
+            net_worth=fmt(match["net_worth"]),
         )
 
         # Доп инфа если есть
@@ -351,18 +468,21 @@ class DotaHandlers:
         if extras:
             text += "\n" + " • ".join(extras) + "\n"
 
-        text += f"\n🔗 [Подробнее](https://www.opendota.com/matches/{match['match_id']})"
+        text += f"\n🔗 <a href=\"https://www.opendota.com/matches/{match['match_id']}\">Подробнее</a>"
 
-        await msg.edit_text(text, parse_mode="Markdown")
+        await msg.edit_text(text, parse_mode=ParseMode.HTML)
 
     async def toxic_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
         /toxic [@user] — топ слов из чата игрока.
         """
-        if update.message.reply_to_message:
-            target_user = update.message.reply_to_message.from_user
+        message = update.message
+        user = update.effective_user
+
+        if message.reply_to_message:
+            target_user = message.reply_to_message.from_user
         else:
-            target_user = update.effective_user
+            target_user = user
 
         target_id = target_user.id
         target_name = target_user.first_name
@@ -370,99 +490,68 @@ class DotaHandlers:
         account_id = await self.steam_repo.get_account_id(target_id)
 
         if not account_id:
-            if target_id == update.effective_user.id:
-                await update.message.reply_text("❌ Сначала привяжи Steam! /link")
+            if target_id == user.id:
+                await message.reply_text("❌ Сначала привяжи Steam! /link")
             else:
-                await update.message.reply_text(f"❌ У {target_name} не привязан Steam")
+                await message.reply_text(f"❌ У {target_name} не привязан Steam")
             return
 
-        msg = await update.message.reply_text(f"🔍 Анализирую токсичность {target_name}...")
-
-        words = await self.opendota.get_wordcloud(account_id)
+        msg, words = await asyncio.gather(
+            message.reply_text(f"🔍 Анализирую токсичность {target_name}..."),
+            self.opendota.get_wordcloud(account_id),
+        )
 
         if not words:
             await msg.edit_text(
-                f"😇 *{target_name}* — святой человек!\n\n" f"_Либо не пишет в чат, либо данных нет_",
-                parse_mode="Markdown",
+                _TOXIC_SAINT_HTML.format(name=html.escape(target_name)),
+                parse_mode=ParseMode.HTML,
             )
             return
 
-        # Сортируем по частоте
-        sorted_words = sorted(words.items(), key=lambda x: x[1], reverse=True)
-
-        # Берём топ-10
-        top_words = sorted_words[:10]
-        total_words = sum(words.values())
-
-        # Определяем "токсичность" по ключевым словам
-        toxic_words = {
-            "gg",
-            "ez",
-            "noob",
-            "report",
-            "trash",
-            "bad",
-            "wtf",
-            "fuck",
-            "shit",
-            "idiot",
-            "stupid",
-            "dog",
-            "animal",
-            "cyka",
-            "blyat",
-            "сука",
-            "блять",
-            "gg ez",
-        }
-
-        toxic_count = sum(count for word, count in words.items() if word.lower() in toxic_words)
-        toxic_percent = (toxic_count / total_words * 100) if total_words > 0 else 0
-
-        # Рейтинг токсичности
-        if toxic_percent > 20:
-            rating = "☢️ ЯДЕРНЫЙ ТОКСИК"
-        elif toxic_percent > 10:
-            rating = "🔥 Токсичный"
-        elif toxic_percent > 5:
-            rating = "😤 Немного солёный"
-        else:
-            rating = "😇 Почти ангел"
+        # Топ-10 по частоте без сортировки всего словаря
+        top_words = heapq.nlargest(10, words.items(), key=itemgetter(1))
 
-        # Формируем вывод
-        lines = [f"💬 *Словарь {target_name}*\n"]
-        lines.append(f"{rating}\n")
+        # Всего слов и "токсичные" по ключевым словам — за один проход
+        total_words = 0
+        toxic_count = 0
+        for word, count in words.items():
+            total_words += count
+            if word in TOXIC_WORDS:
+                toxic_count += count
 
-        medals = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟"]
+        toxic_percent = (toxic_count / total_words * 100) if total_words > 0 else 0
 
-        for i, (word, count) in enumerate(top_words):
-            medal = medals[i] if i < len(medals) else "•"
-            # Цензурим особо жёсткие слова (опционально)
-            display_word = word
-            lines.append(f"{medal} `{display_word}` — {count}")
+        # Рейтинг токсичности
+        rating = toxic_rating(toxic_percent)
 
-        lines.append(f"\n📊 Всего слов: {total_words}")
+        # Формируем вывод: nlargest отдаёт не больше 10 слов — медали хватает на каждое
+        body = "\n".join(
+            f"{medal} <code>{html.escape(word)}</code> — {count}" for medal, (word, count) in zip(MEDALS, top_words)
+        )
 
-        await msg.edit_text("\n".join(lines), parse_mode="Markdown")
+        await msg.edit_text(
+            f"💬 <b>Словарь {html.escape(target_name)}</b>\n\n{rating}\n\n{body}\n\n📊 Всего слов: {total_words}",
+            parse_mode=ParseMode.HTML,
+        )
 
     async def shame_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
         /shame on|off — подписка на уведомления о позоре после матчей.
         """
+        message = update.message
+        chat = update.effective_chat
         user_id = update.effective_user.id
-        chat_id = update.effective_chat.id
+        chat_id = chat.id
 
         # Проверяем что это групповой чат
-        if update.effective_chat.type not in ("supergroup", "group"):
-            await update.message.reply_text(
-                "❌ Эта команда работает только в группах!\n" "Добавь бота в чат с друзьями."
-            )
+        if chat.type not in ("supergroup", "group"):
+            await message.reply_text("❌ Эта команда работает только в группах!\n" "Добавь бота в чат с друзьями.")
             return
 
         # Проверяем привязку Steam
         account_id = await self.steam_repo.get_account_id(user_id)
         if not account_id:
-            await update.message.reply_text("❌ Сначала привяжи Steam!\n" "Напиши мне в ЛС: /link")
+            await message.reply_text("❌ Сначала привяжи Steam!\n" "Напиши мне в ЛС: /link")
             return
 
         # Парсим аргумент
@@ -470,33 +559,15 @@ class DotaHandlers:
             # Показываем статус
             is_subscribed = await self.steam_repo.is_shame_subscribed(user_id, chat_id)
             status = "✅ включены" if is_subscribed else "❌ выключены"
-            await update.message.reply_text(
-                f"🔔 *Уведомления о позоре:* {status}\n\n"
-                f"Используй:\n"
-                f"`/shame on` — включить\n"
-                f"`/shame off` — выключить\n\n"
-                f"_После каждой катки бот найдёт самого бесполезного и опозорит его в чате_ 😈",
-                parse_mode="Markdown",
-            )
+            await message.reply_text(_SHAME_STATUS_MD.format(status=status), parse_mode="Markdown")
             return
 
-        action = context.args[0].lower()
+        action = _SHAME_ACTIONS.get(context.args[0].lower())
 
-        if action == "on":
-            await self.steam_repo.subscribe_shame(user_id, chat_id)
-            await update.message.reply_text(
-                "✅ *Подписка активирована!*\n\n"
-                "Теперь после каждой катки бот определит "
-                "самого бесполезного игрока и опозорит его 😈\n\n"
-                "_Проверка происходит каждые 2 минуты_",
-                parse_mode="Markdown",
-            )
-
-        elif action == "off":
-            await self.steam_repo.unsubscribe_shame(user_id, chat_id)
-            await update.message.reply_text(
-                "❌ *Подписка отключена*\n\n" "Больше никакого позора... пока что 👀", parse_mode="Markdown"
-            )
+        if action is None:
+            await message.reply_text(_SHAME_USAGE_MD, parse_mode="Markdown")
+            return
 
-        else:
-            await update.message.reply_text("❓ Используй `/shame on` или `/shame off`", parse_mode="Markdown")
+        get_method, text = action
+        await get_method(self.steam_repo)(user_id, chat_id)
+        await message.reply_text(text, parse_mode="Markdown")
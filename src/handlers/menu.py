@@ -1,8 +1,17 @@
 """
 Обработчики меню и навигации.
+
+Все обработчики выполняются в одном event loop, поэтому блокирующий ввод-вывод
+здесь недопустим: репозитории работают через aiosqlite, а синхронный код
+(файлы, CPU-тяжёлые вычисления) нужно выносить через asyncio.to_thread.
 """
 
+import asyncio
+import heapq
 import logging
+import time
+from operator import itemgetter
+from typing import Dict, Set, Tuple
 
 from telegram import Update
 from telegram.error import BadRequest
@@ -13,14 +22,30 @@ from src.database.steam_repository import SteamLinkRepository
 from src.services import AdminService, BanService
 from src.services.opendota_service import OpenDotaService
 from src.ui import Keyboards, Messages
+from src.ui.dota_format import MEDALS, TOXIC_WORDS, fmt, rank_emoji, toxic_rating
 from src.ui.messages import UserInfo
 
 logger = logging.getLogger(__name__)
 
+# Фрагменты текста BadRequest. PTB отдаёт описание ошибки через str.capitalize(),
+# поэтому всё после первой буквы уже в нижнем регистре и .lower() не нужен
+_NOT_MODIFIED = "is not modified"
+_MESSAGE_GONE = ("to edit not found", "can't be edited")
+
+# Тип лимита из callback_data -> (ключ лимита, ключ окна) в настройках чата
+_SETTING_KEYS = {t: (f"{t}_limit", f"{t}_window") for t in ("sticker", "text", "image", "video")}
+
 
 class MenuHandlers:
     """Обработчики меню."""
 
+    # Сколько секунд помнится последняя отрисовка сообщения меню
+    RENDER_CACHE_TTL = 600
+    # Максимум сообщений в кэше отрисовок, при переполнении вытесняется самое старое
+    RENDER_CACHE_SIZE = 4096
+    # Сколько секунд копятся нажатия ➖/➕ перед записью лимита и перерисовкой
+    SETTINGS_DEBOUNCE = 0.3
+
     def __init__(
         self,
         ban_service: BanService,
@@ -40,6 +65,48 @@ class MenuHandlers:
         self.stats_repo = stats_repo
         self.steam_repo = steam_repo
         self.opendota = opendota
+        # (chat_id, message_id) -> (момент истечения по time.monotonic(), отпечаток последней отрисовки)
+        self._render_cache: Dict[Tuple[int, int], Tuple[float, int]] = {}
+        # (chat_id, ключ лимита) -> значение, ожидающее записи отложенной задачей.
+        # Удаляется только после того, как запись в БД завершилась
+        self._pending_limits: Dict[Tuple[int, str], int] = {}
+        # (chat_id, ключ лимита) -> блокировка: нажатие не читает лимит, пока идёт его запись
+        self._limit_locks: Dict[Tuple[int, str], asyncio.Lock] = {}
+        # Ссылки на отложенные задачи: event loop держит задачи только по слабой ссылке
+        self._flush_tasks: Set["asyncio.Task[None]"] = set()
+
+        # menu_<раздел>_<owner_id> -> обработчик (query, context, chat_id, user_id)
+        self._menu_sections = {
+            "main": self._show_main,
+            "stats": lambda query, context, chat_id, user_id: self._show_user_stats(query, context, user_id, chat_id),
+            "top": self._show_top,
+            "chatstats": self._show_chat_stats_periods,
+            "settings": self._show_settings,
+            "whitelist": self._show_whitelist,
+            "dota": lambda query, context, chat_id, user_id: self._show_dota_menu(query, context, user_id),
+            "help": self._show_help,
+        }
+        # dota_<действие>_<owner_id> -> обработчик (query, context, chat_id, user_id, account_id)
+        self._dota_actions = {
+            "game": lambda query, context, chat_id, user_id, account_id: self._dota_check_game(
+                query, context, user_id, account_id
+            ),
+            "last": lambda query, context, chat_id, user_id, account_id: self._dota_last_match(
+                query, context, user_id, account_id
+            ),
+            "profile": lambda query, context, chat_id, user_id, account_id: self._dota_profile(
+                query, context, account_id, user_id
+            ),
+            "toxic": lambda query, context, chat_id, user_id, account_id: self._dota_toxic(
+                query, context, user_id, account_id
+            ),
+            "shame_toggle": lambda query, context, chat_id, user_id, account_id: self._dota_shame_toggle(
+                query, context, user_id, chat_id
+            ),
+            "unlink": lambda query, context, chat_id, user_id, account_id: self._dota_unlink(query, user_id),
+        }
+        # Префикс callback_data с параметром -> обработчик (query, context, chat_id, user_id, параметр)
+        self._menu_prefixes = (("chatstats_", self._on_chatstats),)
 
     def _extract_owner_id(self, callback_data: str) -> int | None:
         """Извлекает owner_id из callback_data.
@@ -50,14 +117,45 @@ class MenuHandlers:
         Returns:
             owner_id если найден, иначе None
         """
+        # Последняя часть должна быть числом (owner_id)
+        tail = callback_data.rpartition("_")[2]
+        return int(tail) if tail.isdecimal() else None
+
+    async def _safe_edit(self, query, text: str, **kwargs) -> None:
+        """Редактирует сообщение меню, если отрисовка отличается от предыдущей.
+
+        Повторное нажатие той же кнопки не отправляет запрос в Telegram,
+        который всё равно ответил бы "message is not modified".
+        """
+        message = query.message
+        if message is None:
+            # Inline-сообщение или слишком старое — сравнивать не с чем
+            await query.edit_message_text(text, **kwargs)
+            return
+
+        key = (message.chat_id, message.message_id)
+        # InlineKeyboardMarkup хэшируется по кнопкам, так что JSON для сравнения не нужен
+        fingerprint = hash((text, kwargs.get("parse_mode"), kwargs.get("reply_markup")))
+
+        cached = self._render_cache.get(key)
+        if cached and cached[0] > time.monotonic() and cached[1] == fingerprint:
+            return
+
         try:
-            parts = callback_data.split("_")
-            # Последняя часть должна быть числом (owner_id)
-            if parts and parts[-1].isdigit():
-                return int(parts[-1])
+            await query.edit_message_text(text, **kwargs)
+        except BadRequest as e:
+            if _NOT_MODIFIED not in str(e):
+                # Неизвестно, что сейчас в сообщении — забываем отрисовку
+                self._render_cache.pop(key, None)
+                raise
         except Exception:
-            pass
-        return None
+            self._render_cache.pop(key, None)
+            raise
+
+        if key not in self._render_cache and len(self._render_cache) >= self.RENDER_CACHE_SIZE:
+            # dict хранит порядок вставки — первый ключ самый старый
+            self._render_cache.pop(next(iter(self._render_cache)))
+        self._render_cache[key] = (time.monotonic() + self.RENDER_CACHE_TTL, fingerprint)
 
     # ═══════════════════════════════════════════════════════════
     # 🏠 ГЛАВНОЕ МЕНЮ
@@ -93,67 +191,55 @@ class MenuHandlers:
             return
 
         try:
-            if data.startswith("menu_main"):
-                await query.edit_message_text(
-                    Messages.welcome(), parse_mode="Markdown", reply_markup=Keyboards.main_menu(user_id)
-                )
-
-            elif data.startswith("menu_stats"):
-                await self._show_user_stats(query, context, user_id, chat_id)
-
-            elif data.startswith("menu_top"):
-                await self._show_top(query, context, chat_id, user_id)
-
-            elif data.startswith("menu_chatstats"):
-                await query.edit_message_text(
-                    "📈 *Статистика чата*\n\nВыбери период:",
-                    parse_mode="Markdown",
-                    reply_markup=Keyboards.stats_period(user_id),
-                )
-
-            elif data.startswith("chatstats_"):
-                parts = data.split("_")
-                days = int(parts[1])
-                await self._show_chat_stats(query, context, chat_id, days, user_id)
-
-            elif data.startswith("menu_settings"):
-                await self._show_settings(query, context, chat_id, user_id)
-
-            elif data.startswith("menu_whitelist"):
-                await self._show_whitelist(query, context, chat_id, user_id)
-
-            elif data.startswith("whitelist_page_"):
-                parts = data.split("_")
-                page = int(parts[2])
-                await self._show_whitelist(query, context, chat_id, user_id, page=page)
-
-            elif data.startswith("menu_dota"):
-                await self._show_dota_menu(query, context, user_id)
-
-            elif data.startswith("menu_help"):
-                await query.edit_message_text(
-                    Messages.help_text(),
-                    parse_mode="Markdown",
-                    reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
-                )
+            if data.startswith("menu_"):
+                section = data[len("menu_") :].partition("_")[0]
+                handler = self._menu_sections.get(section)
+                if handler:
+                    await handler(query, context, chat_id, user_id)
 
             elif data == "ignore":
                 await query.answer("ℹ️ Это информационная кнопка", show_alert=False)
 
+            else:
+                for prefix, handler in self._menu_prefixes:
+                    if data.startswith(prefix):
+                        await handler(query, context, chat_id, user_id, data[len(prefix) :])
+                        break
+
         except BadRequest as e:
-            error_msg = str(e).lower()
-            if "message is not modified" in error_msg:
+            error_msg = str(e)
+            if _NOT_MODIFIED in error_msg:
                 pass  # Игнорируем - сообщение уже в нужном состоянии
-            elif "message to edit not found" in error_msg or "message can't be edited" in error_msg:
+            elif any(needle in error_msg for needle in _MESSAGE_GONE):
                 # Сообщение было удалено или недоступно - отправляем новое
                 try:
                     await query.message.reply_text(
                         Messages.welcome(), parse_mode="Markdown", reply_markup=Keyboards.main_menu(user_id)
                     )
                 except Exception as send_error:
-                    logger.error(f"Failed to send new message: {send_error}")
+                    logger.error("Failed to send new message: %s", send_error)
             else:
-                logger.error(f"Menu callback error: {e}")
+                logger.error("Menu callback error: %s", e)
+
+    async def _show_main(self, query, context, chat_id: int, user_id: int) -> None:
+        """Показывает главное меню."""
+        await self._safe_edit(
+            query, Messages.welcome(), parse_mode="Markdown", reply_markup=Keyboards.main_menu(user_id)
+        )
+
+    async def _show_help(self, query, context, chat_id: int, user_id: int) -> None:
+        """Показывает справку."""
+        await self._safe_edit(
+            query,
+            Messages.help_text(),
+            parse_mode="Markdown",
+            reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
+        )
+
+    async def _on_whitelist_page(self, query, context, chat_id: int, user_id: int, param: str) -> None:
+        """whitelist_page_<page>_<owner_id> — страница белого списка."""
+        page = int(param.partition("_")[0])
+        await self._show_whitelist(query, context, chat_id, user_id, page=page)
 
     # ═══════════════════════════════════════════════════════════
     # 📊 СТАТИСТИКА
@@ -161,14 +247,17 @@ class MenuHandlers:
 
     async def _show_user_stats(self, query, context, user_id: int, chat_id: int) -> None:
         """Показывает статистику пользователя."""
-        violations, banned_until = await self.violation_repo.get_info(user_id, chat_id)
-        is_banned = await self.ban_service.is_banned(user_id, chat_id)
-        remaining = await self.ban_service.get_remaining_time(user_id, chat_id)
-        is_whitelisted = await self.whitelist_repo.is_whitelisted(user_id, chat_id)
+        # Запросы независимы — выполняем параллельно
+        (violations, _), (is_banned, remaining), is_whitelisted = await asyncio.gather(
+            self.violation_repo.get_info(user_id, chat_id),
+            self.ban_service.get_ban_status(user_id, chat_id),
+            self.whitelist_repo.is_whitelisted(user_id, chat_id),
+        )
 
         user = UserInfo(user_id=user_id, name=query.from_user.first_name, username=query.from_user.username)
 
-        await query.edit_message_text(
+        await self._safe_edit(
+            query,
             Messages.user_stats(user, violations, is_banned, remaining, is_whitelisted),
             parse_mode="Markdown",
             reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
@@ -178,27 +267,35 @@ class MenuHandlers:
         """Показывает топ нарушителей."""
         top_list = await self.violation_repo.get_top(chat_id, 10)
 
-        # Получаем имена
-        names = {}
-        for uid, _ in top_list:
-            try:
-                member = await context.bot.get_chat_member(chat_id, uid)
-                names[uid] = member.user.first_name
-            except Exception:
-                names[uid] = f"ID {uid}"
+        names = await self.admin_service.get_member_names(context, chat_id, (uid for uid, _ in top_list))
 
-        await query.edit_message_text(
+        await self._safe_edit(
+            query,
             Messages.top_violators(top_list, names),
             parse_mode="Markdown",
             reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
         )
 
+    async def _show_chat_stats_periods(self, query, context, chat_id: int, user_id: int) -> None:
+        """Показывает выбор периода статистики чата."""
+        await self._safe_edit(
+            query,
+            "📈 *Статистика чата*\n\nВыбери период:",
+            parse_mode="Markdown",
+            reply_markup=Keyboards.stats_period(user_id),
+        )
+
+    async def _on_chatstats(self, query, context, chat_id: int, user_id: int, param: str) -> None:
+        """chatstats_<days>_<owner_id> — статистика чата за период."""
+        days = int(param.partition("_")[0])
+        await self._show_chat_stats(query, context, chat_id, days, user_id)
+
     async def _show_chat_stats(self, query, context, chat_id: int, days: int, user_id: int) -> None:
         """Показывает статистику чата."""
         stats = await self.stats_repo.get_stats(chat_id, days)
 
-        await query.edit_message_text(
-            Messages.chat_stats(stats, days), parse_mode="Markdown", reply_markup=Keyboards.stats_period(user_id)
+        await self._safe_edit(
+            query, Messages.chat_stats(stats, days), parse_mode="Markdown", reply_markup=Keyboards.stats_period(user_id)
         )
 
     # ═══════════════════════════════════════════════════════════
@@ -207,19 +304,21 @@ class MenuHandlers:
 
     async def _show_settings(self, query, context, chat_id: int, user_id: int) -> None:
         """Показывает настройки."""
-        # Проверка прав
-        is_admin = await self.admin_service.is_chat_admin(context, chat_id, user_id)
-
-        settings = await self.settings_repo.get(chat_id)
+        # Проверка прав и чтение настроек независимы — выполняем параллельно
+        is_admin, settings = await asyncio.gather(
+            self.admin_service.is_chat_admin(context, chat_id, user_id), self.settings_repo.get(chat_id)
+        )
 
         if is_admin:
-            await query.edit_message_text(
+            await self._safe_edit(
+                query,
                 Messages.settings_overview(settings),
                 parse_mode="Markdown",
                 reply_markup=Keyboards.settings_menu(user_id),
             )
         else:
-            await query.edit_message_text(
+            await self._safe_edit(
+                query,
                 Messages.settings_overview(settings) + "\n\n_Только админы могут менять настройки_",
                 parse_mode="Markdown",
                 reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
@@ -240,72 +339,120 @@ class MenuHandlers:
             await query.answer("❌ Это не твоё меню!", show_alert=True)
             return
 
-        # Проверка прав
-        is_admin = await self.admin_service.is_chat_admin(context, chat_id, user_id)
+        # Проверка прав и чтение настроек независимы — выполняем параллельно.
+        # Ответить на нажатие раньше нельзя: не-админу нужен ответ с алертом
+        is_admin, settings = await asyncio.gather(
+            self.admin_service.is_chat_admin(context, chat_id, user_id), self.settings_repo.get(chat_id)
+        )
         if not is_admin:
             await query.answer("❌ Только админы!", show_alert=True)
             return
 
         await query.answer()
-        settings = await self.settings_repo.get(chat_id)
+
+        # Один partition вместо цепочки startswith: "settings" или "setting"
+        kind, _, rest = data.partition("_")
 
         try:
-            if data.startswith("settings_"):
-                parts = data.split("_")
-                setting_type = parts[1]
+            if kind == "settings":
+                # settings_<тип>_<owner_id>
+                setting_type = rest.partition("_")[0]
 
                 if setting_type == "warning":
                     enabled = settings.get("warning_enabled", True)
-                    await query.edit_message_text(
+                    await self._safe_edit(
+                        query,
                         "⚠️ *Предупреждения*\n\n" "_Показывать предупреждение перед баном?_",
                         parse_mode="Markdown",
                         reply_markup=Keyboards.warning_toggle(enabled, user_id),
                     )
                 else:
-                    limit_key = f"{setting_type}_limit"
-                    window_key = f"{setting_type}_window"
-                    await query.edit_message_text(
+                    limit_key, window_key = _SETTING_KEYS[setting_type]
+                    await self._safe_edit(
+                        query,
                         Messages.setting_detail(setting_type, settings[limit_key], settings[window_key]),
                         parse_mode="Markdown",
                         reply_markup=Keyboards.setting_adjust(setting_type, settings[limit_key], user_id),
                     )
 
-            elif data.startswith("setting_"):
-                parts = data.split("_")
-                setting_type = parts[1]
-                action = parts[2]
+            elif kind == "setting":
+                # setting_<тип>_<действие>_<owner_id>
+                setting_type, _, rest = rest.partition("_")
+                action = rest.partition("_")[0]
 
                 if setting_type == "warning":
                     new_value = 1 if action == "on" else 0
                     await self.settings_repo.set(chat_id, "warning_enabled", new_value)
-                    await query.edit_message_text(
+                    await self._safe_edit(
+                        query,
                         "⚠️ *Предупреждения*\n\n" f"{'✅ Включены!' if new_value else '❌ Выключены!'}",
                         parse_mode="Markdown",
                         reply_markup=Keyboards.warning_toggle(bool(new_value), user_id),
                     )
                 else:
-                    limit_key = f"{setting_type}_limit"
-                    current = settings[limit_key]
-
-                    if action == "inc":
-                        new_value = min(current + 1, 20)
-                    elif action == "dec":
-                        new_value = max(current - 1, 1)
-                    else:
-                        new_value = int(action)
+                    limit_key, window_key = _SETTING_KEYS[setting_type]
+                    key = (chat_id, limit_key)
+                    async with self._limit_locks.setdefault(key, asyncio.Lock()):
+                        # Если запись уже запланирована, считаем от ещё не записанного значения.
+                        # Иначе перечитываем настройки: снимок settings мог быть прочитан до того,
+                        # как завершилась предыдущая запись, а кэш репозитория она уже обновила
+                        scheduled = key in self._pending_limits
+                        if scheduled:
+                            current = self._pending_limits[key]
+                        else:
+                            current = (await self.settings_repo.get(chat_id))[limit_key]
+
+                        if action == "inc":
+                            new_value = min(current + 1, 20)
+                        elif action == "dec":
+                            new_value = max(current - 1, 1)
+                        else:
+                            new_value = int(action)
+
+                        # Серия быстрых нажатий даёт одну запись в БД и одно редактирование
+                        self._pending_limits[key] = new_value
+                        if not scheduled:
+                            task = asyncio.create_task(
+                                self._flush_limit(query, chat_id, setting_type, settings[window_key], user_id)
+                            )
+                            self._flush_tasks.add(task)
+                            task.add_done_callback(self._flush_tasks.discard)
 
-                    await self.settings_repo.set(chat_id, limit_key, new_value)
-                    settings[limit_key] = new_value
-
-                    await query.edit_message_text(
-                        Messages.setting_detail(setting_type, new_value, settings[f"{setting_type}_window"]),
-                        parse_mode="Markdown",
-                        reply_markup=Keyboards.setting_adjust(setting_type, new_value, user_id),
-                    )
+        except BadRequest as e:
+            if _NOT_MODIFIED not in str(e):
+                logger.error("Settings callback error: %s", e)
+
+    async def _flush_limit(self, query, chat_id: int, setting_type: str, window: int, user_id: int) -> None:
+        """Через SETTINGS_DEBOUNCE секунд записывает последнее выбранное значение лимита."""
+        await asyncio.sleep(self.SETTINGS_DEBOUNCE)
+
+        limit_key = _SETTING_KEYS[setting_type][0]
+        key = (chat_id, limit_key)
+        # Нажатия во время записи ждут блокировку и потом читают уже записанное значение
+        async with self._limit_locks[key]:
+            new_value = self._pending_limits[key]
+            try:
+                await self.settings_repo.set(chat_id, limit_key, new_value)
+            except Exception as e:
+                logger.error("Failed to save %s for chat %s: %s", limit_key, chat_id, e)
+                return
+            finally:
+                # Следующее нажатие запланирует новую запись
+                del self._pending_limits[key]
 
+        try:
+            await self._safe_edit(
+                query,
+                Messages.setting_detail(setting_type, new_value, window),
+                parse_mode="Markdown",
+                reply_markup=Keyboards.setting_adjust(setting_type, new_value, user_id),
+            )
         except BadRequest as e:
-            if "message is not modified" not in str(e).lower():
-                logger.error(f"Settings callback error: {e}")
+            if _NOT_MODIFIED not in str(e):
+                logger.error("Settings callback error: %s", e)
+        except Exception as e:
+            # Задача фоновая — исключение некому поймать, поэтому только логируем
+            logger.error("Settings callback error: %s", e)
 
     # ═══════════════════════════════════════════════════════════
     # 🤍 БЕЛЫЙ СПИСОК
@@ -315,16 +462,14 @@ class MenuHandlers:
         """Показывает белый список с пагинацией."""
         wl = await self.whitelist_repo.get_all(chat_id)
 
-        # Получаем имена
-        users = []
-        for uid, _ in wl:
-            try:
-                member = await context.bot.get_chat_member(chat_id, uid)
-                users.append((uid, member.user.first_name))
-            except Exception:
-                users.append((uid, f"ID {uid}"))
+        # Имена нужны только для кнопок видимой страницы — остальных не запрашиваем
+        start = page * Keyboards.WHITELIST_PAGE_SIZE
+        visible = wl[start : start + Keyboards.WHITELIST_PAGE_SIZE]
+        names = await self.admin_service.get_member_names(context, chat_id, (uid for uid, _ in visible))
+        users = [(uid, names.get(uid)) for uid, _ in wl]
 
-        await query.edit_message_text(
+        await self._safe_edit(
+            query,
             Messages.whitelist_view(len(users)),
             parse_mode="Markdown",
             reply_markup=Keyboards.whitelist_menu(users, page, user_id),
@@ -349,6 +494,12 @@ class MenuHandlers:
             await query.answer("Ответь на сообщение пользователя командой /trust", show_alert=True)
             return
 
+        if data.startswith("whitelist_page_"):
+            # Листать список может любой, права нужны только для изменений
+            await query.answer()
+            await self._on_whitelist_page(query, context, chat_id, user_id, data[len("whitelist_page_") :])
+            return
+
         # Проверка прав для изменений
         is_admin = await self.admin_service.is_chat_admin(context, chat_id, user_id)
         if not is_admin:
@@ -358,34 +509,26 @@ class MenuHandlers:
         await query.answer()
 
         if data.startswith("whitelist_add_"):
-            parts = data.split("_")
-            target_id = int(parts[2])
+            target_id = int(data[len("whitelist_add_") :].partition("_")[0])
             await self.whitelist_repo.add(target_id, chat_id, user_id)
 
-            try:
-                member = await context.bot.get_chat_member(chat_id, target_id)
-                user = UserInfo(target_id, member.user.first_name)
-            except Exception:
-                user = UserInfo(target_id, f"ID {target_id}")
+            user = UserInfo(target_id, await self.admin_service.get_member_name(context, chat_id, target_id))
 
-            await query.edit_message_text(
+            await self._safe_edit(
+                query,
                 Messages.whitelist_added(user),
                 parse_mode="Markdown",
                 reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
             )
 
         elif data.startswith("whitelist_remove_"):
-            parts = data.split("_")
-            target_id = int(parts[2])
+            target_id = int(data[len("whitelist_remove_") :].partition("_")[0])
             await self.whitelist_repo.remove(target_id, chat_id)
 
-            try:
-                member = await context.bot.get_chat_member(chat_id, target_id)
-                user = UserInfo(target_id, member.user.first_name)
-            except Exception:
-                user = UserInfo(target_id, f"ID {target_id}")
+            user = UserInfo(target_id, await self.admin_service.get_member_name(context, chat_id, target_id))
 
-            await query.edit_message_text(
+            await self._safe_edit(
+                query,
                 Messages.whitelist_removed(user),
                 parse_mode="Markdown",
                 reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
@@ -401,21 +544,21 @@ class MenuHandlers:
         is_shame_subscribed = False
 
         if self.steam_repo:
-            account_id = await self.steam_repo.get_account_id(user_id)
+            # Привязка и подписка — одним запросом
+            account_id, is_shame_subscribed = await self.steam_repo.get_dota_status(user_id, query.message.chat_id)
             is_linked = account_id is not None
 
-            if is_linked:
-                chat_id = query.message.chat_id
-                is_shame_subscribed = await self.steam_repo.is_shame_subscribed(user_id, chat_id)
-
         text = "🎮 *Dota 2*\n\n"
         if is_linked:
             text += "✅ Steam привязан\n\nВыбери действие:"
         else:
             text += "❌ Steam не привязан\n\nПривяжи аккаунт чтобы использовать функции:"
 
-        await query.edit_message_text(
-            text, parse_mode="Markdown", reply_markup=Keyboards.dota_menu(user_id, is_linked, is_shame_subscribed)
+        await self._safe_edit(
+            query,
+            text,
+            parse_mode="Markdown",
+            reply_markup=Keyboards.dota_menu(user_id, is_linked, is_shame_subscribed),
         )
 
     async def handle_dota_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -433,11 +576,23 @@ class MenuHandlers:
             await query.answer("❌ Это не твоё меню!", show_alert=True)
             return
 
-        await query.answer()
+        # dota_<действие>_<owner_id>: действие может само содержать "_" (link_info, shame_toggle)
+        action = data[len("dota_") :]
+        if owner_id:
+            action = action.rpartition("_")[0]
+
+        handler = self._dota_actions.get(action)
+        if handler and self.steam_repo and self.opendota:
+            # Ответ убирает "часики" с кнопки — отправляем его параллельно с поиском привязки Steam
+            _, account_id = await asyncio.gather(query.answer(), self.steam_repo.get_account_id(user_id))
+        else:
+            await query.answer()
+            account_id = None
 
         try:
-            if data.startswith("dota_link_info"):
-                await query.edit_message_text(
+            if action == "link_info":
+                await self._safe_edit(
+                    query,
                     "🔗 *Как привязать Steam:*\n\n"
                     "Напиши мне в ЛС команду:\n"
                     "`/link <ссылка или ID>`\n\n"
@@ -453,58 +608,52 @@ class MenuHandlers:
 
             # Для остальных команд нужна привязка
             if not self.steam_repo or not self.opendota:
-                await query.edit_message_text(
+                await self._safe_edit(
+                    query,
                     "❌ Сервис временно недоступен",
                     reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
                 )
                 return
 
-            account_id = await self.steam_repo.get_account_id(user_id)
+            if not handler:
+                return
 
             if not account_id:
-                await query.edit_message_text(
+                await self._safe_edit(
+                    query,
                     "❌ Сначала привяжи Steam!\n" "Напиши мне в ЛС: /link",
                     reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
                 )
                 return
 
-            if data.startswith("dota_game"):
-                await self._dota_check_game(query, context, user_id, account_id)
-
-            elif data.startswith("dota_last"):
-                await self._dota_last_match(query, context, user_id, account_id)
-
-            elif data.startswith("dota_profile"):
-                await self._dota_profile(query, context, account_id, user_id)
-
-            elif data.startswith("dota_toxic"):
-                await self._dota_toxic(query, context, user_id, account_id)
-
-            elif data.startswith("dota_shame_toggle"):
-                await self._dota_shame_toggle(query, context, user_id, chat_id)
-
-            elif data.startswith("dota_unlink"):
-                await self.steam_repo.unlink(user_id)
-                await query.edit_message_text(
-                    "✅ Steam отвязан!", reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True)
-                )
+            await handler(query, context, chat_id, user_id, account_id)
 
         except BadRequest as e:
-            if "message is not modified" not in str(e).lower():
-                logger.error(f"Dota callback error: {e}")
+            if _NOT_MODIFIED not in str(e):
+                logger.error("Dota callback error: %s", e)
+
+    async def _dota_unlink(self, query, user_id: int) -> None:
+        """Отвязывает Steam аккаунт."""
+        await self.steam_repo.unlink(user_id)
+        await self._safe_edit(
+            query,
+            "✅ Steam отвязан!",
+            reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
+        )
 
     async def _dota_check_game(self, query, context, user_id: int, account_id: int) -> None:
         """Проверяет в игре ли пользователь."""
         name = query.from_user.first_name
 
-        await query.edit_message_text(f"🔍 Чекаю {name}...")
+        await self._safe_edit(query, f"🔍 Чекаю {name}...")
 
         live = await self.opendota.get_live_game(account_id)
 
         if live:
             mmr_text = f"📊 ~{live.avg_mmr} MMR" if live.avg_mmr else ""
 
-            await query.edit_message_text(
+            await self._safe_edit(
+                query,
                 f"🎮 *{name} в игре!*\n\n"
                 f"⏱ *{live.time_str}* минута\n"
                 f"🦸 {live.player_hero}\n"
@@ -515,7 +664,8 @@ class MenuHandlers:
                 reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
             )
         else:
-            await query.edit_message_text(
+            await self._safe_edit(
+                query,
                 f"😴 *{name}* сейчас не в игре\n\n" f"_Или матч не отслеживается OpenDota_",
                 parse_mode="Markdown",
                 reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
@@ -525,12 +675,13 @@ class MenuHandlers:
         """Показывает детальную стату последнего матча."""
         name = query.from_user.first_name
 
-        await query.edit_message_text(f"🔍 Загружаю матч {name}...")
+        await self._safe_edit(query, f"🔍 Загружаю матч {name}...")
 
         match = await self.opendota.get_match_details(account_id)
 
         if not match:
-            await query.edit_message_text(
+            await self._safe_edit(
+                query,
                 "❌ Не удалось получить данные матча",
                 reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
             )
@@ -539,20 +690,6 @@ class MenuHandlers:
         result = "✅ *ПОБЕДА*" if match["win"] else "❌ *ПОРАЖЕНИЕ*"
         kda = f"{match['kills']}/{match['deaths']}/{match['assists']}"
 
-        def rank_emoji(rank):
-            if rank == 1:
-                return "🥇"
-            elif rank == 2:
-                return "🥈"
-            elif rank == 3:
-                return "🥉"
-            return f"#{rank}"
-
-        def fmt(n):
-            if n >= 1000:
-                return f"{n / 1000:.1f}k"
-            return str(n)
-
         text = (
             f"📊 *Последний матч {name}*\n\n"
             f"{result} • {match['hero']}\n"
@@ -567,8 +704,11 @@ class MenuHandlers:
             f"\n🔗 [Подробнее](https://www.opendota.com/matches/{match['match_id']})"
         )
 
-        await query.edit_message_text(
-            text, parse_mode="Markdown", reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True)
+        await self._safe_edit(
+            query,
+            text,
+            parse_mode="Markdown",
+            reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
         )
 
     async def _dota_profile(self, query, context, account_id: int, user_id: int) -> None:
@@ -576,7 +716,8 @@ class MenuHandlers:
         profile = await self.opendota.get_profile(account_id)
 
         if not profile:
-            await query.edit_message_text(
+            await self._safe_edit(
+                query,
                 "❌ Не удалось загрузить профиль",
                 reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
             )
@@ -584,7 +725,8 @@ class MenuHandlers:
 
         mmr_text = f"📈 ~{profile.mmr_estimate} MMR" if profile.mmr_estimate else ""
 
-        await query.edit_message_text(
+        await self._safe_edit(
+            query,
             f"👤 *{profile.persona_name}*\n\n"
             f"🏅 {profile.rank_name}\n"
             f"{mmr_text}\n\n"
@@ -598,68 +740,41 @@ class MenuHandlers:
         """Показывает анализ токсичности."""
         name = query.from_user.first_name
 
-        await query.edit_message_text(f"🔍 Анализирую токсичность {name}...")
+        await self._safe_edit(query, f"🔍 Анализирую токсичность {name}...")
 
         words = await self.opendota.get_wordcloud(account_id)
 
         if not words:
-            await query.edit_message_text(
+            await self._safe_edit(
+                query,
                 f"😇 *{name}* — святой человек!\n\n" f"_Либо не пишет в чат, либо данных нет_",
                 parse_mode="Markdown",
                 reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
             )
             return
 
-        sorted_words = sorted(words.items(), key=lambda x: x[1], reverse=True)
-        top_words = sorted_words[:10]
-        total_words = sum(words.values())
-
-        toxic_words = {
-            "gg",
-            "ez",
-            "noob",
-            "report",
-            "trash",
-            "bad",
-            "wtf",
-            "fuck",
-            "shit",
-            "idiot",
-            "stupid",
-            "dog",
-            "animal",
-            "cyka",
-            "blyat",
-            "сука",
-            "блять",
-            "gg ez",
-        }
+        # Топ-10 по частоте без сортировки всего словаря
+        top_words = heapq.nlargest(10, words.items(), key=itemgetter(1))
 
-        toxic_count = sum(count for word, count in words.items() if word.lower() in toxic_words)
-        toxic_percent = (toxic_count / total_words * 100) if total_words > 0 else 0
+        # Всего слов и "токсичные" по ключевым словам — за один проход.
+        # get_wordcloud уже приводит слова к нижнему регистру
+        total_words = 0
+        toxic_count = 0
+        for word, count in words.items():
+            total_words += count
+            if word in TOXIC_WORDS:
+                toxic_count += count
 
-        if toxic_percent > 20:
-            rating = "☢️ ЯДЕРНЫЙ ТОКСИК"
-        elif toxic_percent > 10:
-            rating = "🔥 Токсичный"
-        elif toxic_percent > 5:
-            rating = "😤 Немного солёный"
-        else:
-            rating = "😇 Почти ангел"
-
-        lines = [f"💬 *Словарь {name}*\n"]
-        lines.append(f"{rating}\n")
-
-        medals = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟"]
+        toxic_percent = (toxic_count / total_words * 100) if total_words > 0 else 0
 
-        for i, (word, count) in enumerate(top_words):
-            medal = medals[i] if i < len(medals) else "•"
-            lines.append(f"{medal} `{word}` — {count}")
+        rating = toxic_rating(toxic_percent)
 
-        lines.append(f"\n📊 Всего слов: {total_words}")
+        # nlargest отдаёт не больше 10 слов — медали хватает на каждое
+        body = "\n".join(f"{medal} `{word}` — {count}" for medal, (word, count) in zip(MEDALS, top_words))
 
-        await query.edit_message_text(
-            "\n".join(lines),
+        await self._safe_edit(
+            query,
+            f"💬 *Словарь {name}*\n\n{rating}\n\n{body}\n\n📊 Всего слов: {total_words}",
             parse_mode="Markdown",
             reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
         )
@@ -675,6 +790,9 @@ class MenuHandlers:
             await self.steam_repo.subscribe_shame(user_id, chat_id)
             text = "✅ *Подписка активирована!*\n\nТеперь после каждой катки бот определит самого бесполезного 😈"
 
-        await query.edit_message_text(
-            text, parse_mode="Markdown", reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True)
+        await self._safe_edit(
+            query,
+            text,
+            parse_mode="Markdown",
+            reply_markup=Keyboards.back_button(f"menu_main_{user_id}", as_markup=True),
         )
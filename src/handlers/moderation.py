@@ -2,6 +2,7 @@
 Обработчики модерации (баны, разбаны, прощения).
 """
 
+import asyncio
 import logging
 
 from telegram import Update
@@ -54,15 +55,15 @@ class ModerationHandlers:
 
         try:
             if data.startswith("action_unban_"):
-                target_id = int(data.split("_")[2])
+                target_id = int(data.rpartition("_")[2])
                 await self._handle_unban(query, context, chat_id, target_id, admin_name)
 
             elif data.startswith("action_pardon_"):
-                target_id = int(data.split("_")[2])
+                target_id = int(data.rpartition("_")[2])
                 await self._handle_pardon(query, context, chat_id, target_id, admin_name)
 
             elif data.startswith("user_info_"):
-                target_id = int(data.split("_")[2])
+                target_id = int(data.rpartition("_")[2])
                 await self._show_user_info(query, context, chat_id, target_id)
 
             elif data == "action_cancel":
@@ -102,10 +103,12 @@ class ModerationHandlers:
 
     async def _show_user_info(self, query, context, chat_id: int, target_id: int) -> None:
         """Показывает информацию о пользователе."""
-        violations, _ = await self.violation_repo.get_info(target_id, chat_id)
-        is_banned = await self.ban_service.is_banned(target_id, chat_id)
-        remaining = await self.ban_service.get_remaining_time(target_id, chat_id)
-        is_whitelisted = await self.whitelist_repo.is_whitelisted(target_id, chat_id)
+        # Запросы независимы — выполняем параллельно
+        (violations, _), (is_banned, remaining), is_whitelisted = await asyncio.gather(
+            self.violation_repo.get_info(target_id, chat_id),
+            self.ban_service.get_ban_status(target_id, chat_id),
+            self.whitelist_repo.is_whitelisted(target_id, chat_id),
+        )
 
         try:
             member = await context.bot.get_chat_member(chat_id, target_id)
@@ -119,6 +122,11 @@ class ModerationHandlers:
             reply_markup=Keyboards.user_actions(target_id, is_banned, is_whitelisted),
         )
 
+    async def handle_chat_member(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Обновляет кэш статусов при смене роли участника (ChatMemberUpdated)."""
+        member = update.chat_member.new_chat_member
+        self.admin_service.update_member_status(update.effective_chat.id, member.user.id, member.status)
+
     # ═══════════════════════════════════════════════════════════
     # 📋 КОМАНДЫ
     # ═══════════════════════════════════════════════════════════
@@ -177,10 +185,12 @@ class ModerationHandlers:
         chat_id = update.effective_chat.id
         user_id = update.effective_user.id
 
-        violations, _ = await self.violation_repo.get_info(user_id, chat_id)
-        is_banned = await self.ban_service.is_banned(user_id, chat_id)
-        remaining = await self.ban_service.get_remaining_time(user_id, chat_id)
-        is_whitelisted = await self.whitelist_repo.is_whitelisted(user_id, chat_id)
+        # Запросы независимы — выполняем параллельно
+        (violations, _), (is_banned, remaining), is_whitelisted = await asyncio.gather(
+            self.violation_repo.get_info(user_id, chat_id),
+            self.ban_service.get_ban_status(user_id, chat_id),
+            self.whitelist_repo.is_whitelisted(user_id, chat_id),
+        )
 
         user = UserInfo(user_id, update.effective_user.first_name)
 
@@ -195,13 +205,7 @@ class ModerationHandlers:
         chat_id = update.effective_chat.id
         top_list = await self.violation_repo.get_top(chat_id, 10)
 
-        names = {}
-        for uid, _ in top_list:
-            try:
-                member = await context.bot.get_chat_member(chat_id, uid)
-                names[uid] = member.user.first_name
-            except Exception:
-                names[uid] = f"ID {uid}"
+        names = await self.admin_service.get_member_names(context, chat_id, (uid for uid, _ in top_list))
 
         await update.message.reply_text(
             Messages.top_violators(top_list, names),
@@ -2,9 +2,11 @@
 Сервис управления админами.
 """
 
+import asyncio
 import logging
+import time
 from pathlib import Path
-from typing import List, Set
+from typing import Dict, Iterable, List, Set, Tuple
 
 from telegram.error import NetworkError, TelegramError
 from telegram.ext import ContextTypes
@@ -15,9 +17,22 @@ logger = logging.getLogger(__name__)
 class AdminService:
     """Сервис для работы с админами."""
 
+    # Сколько секунд статус участника чата живёт в кэше
+    MEMBER_STATUS_TTL = 60
+    # Максимум статусов в кэше, при переполнении вытесняется самый старый
+    MEMBER_STATUS_CACHE_SIZE = 4096
+    # Сколько секунд имя участника чата живёт в кэше
+    MEMBER_NAME_TTL = 300
+    # Максимум имён в кэше, при переполнении вытесняется самое старое
+    MEMBER_NAME_CACHE_SIZE = 10_000
+
     def __init__(self, admin_file: str):
         self.admin_file = admin_file
         self._admins: Set[str] = set()
+        # (chat_id, user_id) -> (момент истечения по time.monotonic(), статус участника)
+        self._status_cache: Dict[Tuple[int, int], Tuple[float, str]] = {}
+        # (chat_id, user_id) -> (момент истечения по time.monotonic(), first_name)
+        self._name_cache: Dict[Tuple[int, int], Tuple[float, str]] = {}
         self.reload()
 
     def _sanitize_username(self, username: str) -> str:
@@ -76,11 +91,81 @@ class AdminService:
         logger.debug(f"Admin check result: {result}")
         return result
 
+    async def _get_member_status(self, context: ContextTypes.DEFAULT_TYPE, chat_id: int, user_id: int) -> str:
+        """
+        Возвращает статус участника чата.
+
+        Проверка прав идёт на каждый клик в меню и каждое сообщение, поэтому статус
+        кэшируется на MEMBER_STATUS_TTL секунд. Ошибки Telegram пробрасываются и не кэшируются.
+        """
+        key = (chat_id, user_id)
+        cached = self._status_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        member = await context.bot.get_chat_member(chat_id, user_id)
+        self.update_member_status(chat_id, user_id, member.status)
+        # Имя пришло тем же запросом — пригодится для /top и меню
+        self._remember_name(chat_id, user_id, member.user.first_name)
+        return member.status
+
+    def update_member_status(self, chat_id: int, user_id: int, status: str) -> None:
+        """Запоминает статус участника чата.
+
+        Вызывается и после запроса к Telegram, и из обработчика ChatMemberUpdated —
+        смена роли сразу попадает в кэш, не дожидаясь истечения MEMBER_STATUS_TTL.
+        """
+        key = (chat_id, user_id)
+        if key not in self._status_cache and len(self._status_cache) >= self.MEMBER_STATUS_CACHE_SIZE:
+            # dict хранит порядок вставки — первый ключ самый старый
+            self._status_cache.pop(next(iter(self._status_cache)))
+        self._status_cache[key] = (time.monotonic() + self.MEMBER_STATUS_TTL, status)
+
+    def _remember_name(self, chat_id: int, user_id: int, name: str) -> None:
+        """Запоминает имя участника чата на MEMBER_NAME_TTL секунд."""
+        key = (chat_id, user_id)
+        if key not in self._name_cache and len(self._name_cache) >= self.MEMBER_NAME_CACHE_SIZE:
+            # dict хранит порядок вставки — первый ключ самый старый
+            self._name_cache.pop(next(iter(self._name_cache)))
+        self._name_cache[key] = (time.monotonic() + self.MEMBER_NAME_TTL, name)
+
+    async def get_member_name(self, context: ContextTypes.DEFAULT_TYPE, chat_id: int, user_id: int) -> str:
+        """
+        Возвращает имя участника чата (или "ID ..." если не удалось получить).
+
+        Топ и меню перерисовываются часто, поэтому имя кэшируется на MEMBER_NAME_TTL секунд.
+        Ошибки Telegram (участник вышел, бот без прав, сеть) дают "ID ...", остальные пробрасываются.
+        """
+        cached = self._name_cache.get((chat_id, user_id))
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        try:
+            member = await context.bot.get_chat_member(chat_id, user_id)
+        except TelegramError as e:
+            # Ошибку не кэшируем — в следующий раз попробуем снова
+            logger.debug("Cannot resolve member %s in %s: %s", user_id, chat_id, type(e).__name__)
+            return f"ID {user_id}"
+
+        self._remember_name(chat_id, user_id, member.user.first_name)
+        return member.user.first_name
+
+    async def get_member_names(
+        self, context: ContextTypes.DEFAULT_TYPE, chat_id: int, user_ids: Iterable[int]
+    ) -> Dict[int, str]:
+        """Возвращает имена участников чата: user_id -> имя.
+
+        Запросы к Telegram идут параллельно, порядок user_ids сохраняется.
+        """
+        user_ids = list(user_ids)
+        names = await asyncio.gather(*(self.get_member_name(context, chat_id, uid) for uid in user_ids))
+        return dict(zip(user_ids, names))
+
     async def is_chat_owner(self, context: ContextTypes.DEFAULT_TYPE, chat_id: int, user_id: int) -> bool:
         """Проверяет, является ли пользователь владельцем чата."""
         try:
-            member = await context.bot.get_chat_member(chat_id, user_id)
-            result = member.status == "creator"
+            status = await self._get_member_status(context, chat_id, user_id)
+            result = status == "creator"
             logger.debug(f"Chat owner check for user_id={user_id}: {result}")
             return result
         except (NetworkError, TimeoutError) as e:
@@ -93,8 +178,8 @@ class AdminService:
     async def is_chat_admin(self, context: ContextTypes.DEFAULT_TYPE, chat_id: int, user_id: int) -> bool:
         """Проверяет, является ли пользователь админом чата."""
         try:
-            member = await context.bot.get_chat_member(chat_id, user_id)
-            result = member.status in ("creator", "administrator")
+            status = await self._get_member_status(context, chat_id, user_id)
+            result = status in ("creator", "administrator")
             logger.debug(f"Chat admin check for user_id={user_id}: {result}")
             return result
         except (NetworkError, TimeoutError) as e:
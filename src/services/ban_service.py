@@ -3,7 +3,7 @@
 """
 
 import logging
-from datetime import datetime, timedelta
+import time
 from typing import Optional, Tuple
 
 from telegram import ChatPermissions
@@ -50,7 +50,7 @@ class BanService:
         self.spam_repo = spam_repo
         self.stats_repo = stats_repo
 
-    async def get_violation_info(self, user_id: int, chat_id: int) -> Tuple[int, Optional[str]]:
+    async def get_violation_info(self, user_id: int, chat_id: int) -> Tuple[int, Optional[int]]:
         """Возвращает информацию о нарушениях."""
         return await self.violation_repo.get_info(user_id, chat_id)
 
@@ -81,7 +81,7 @@ class BanService:
         await self.stats_repo.record_ban(user_id, chat_id, ban_type, ban_minutes, reason)
 
         # Применяем ограничения
-        until_date = int((datetime.now() + timedelta(minutes=ban_minutes)).timestamp())
+        until_date = int(time.time()) + ban_minutes * 60
 
         try:
             await context.bot.restrict_chat_member(
@@ -111,12 +111,16 @@ class BanService:
         await self.spam_repo.clear_user(user_id, chat_id)
         return True
 
-    async def get_remaining_time(self, user_id: int, chat_id: int) -> Optional[int]:
-        """Возвращает оставшееся время бана в минутах."""
+    async def get_ban_status(self, user_id: int, chat_id: int) -> Tuple[bool, Optional[int]]:
+        """Возвращает (забанен ли, оставшееся время бана в минутах) одним чтением из БД."""
         _, banned_until = await self.violation_repo.get_info(user_id, chat_id)
         if banned_until:
-            ban_end = datetime.fromisoformat(banned_until)
-            remaining = ban_end - datetime.now()
-            if remaining.total_seconds() > 0:
-                return int(remaining.total_seconds() / 60)
-        return None
+            remaining = banned_until - time.time()
+            if remaining > 0:
+                return True, int(remaining / 60)
+        return False, None
+
+    async def get_remaining_time(self, user_id: int, chat_id: int) -> Optional[int]:
+        """Возвращает оставшееся время бана в минутах."""
+        _, remaining = await self.get_ban_status(user_id, chat_id)
+        return remaining
@@ -4,12 +4,14 @@
 
 import asyncio
 import logging
+import time
 import traceback
 from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 from functools import wraps
-from typing import Any, Callable, Dict, Optional, TypeVar
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 
 import aiohttp
 
@@ -19,6 +21,18 @@ T = TypeVar("T")
 
 OPENDOTA_API = "https://api.opendota.com/api"
 
+# Результат запроса, когда API временно недоступен (сеть, 5xx, 429). None означает "данных нет"
+_UNAVAILABLE = object()
+
+
+def _freeze(value: Any) -> Any:
+    """Делает JSON-ответ неизменяемым: dict -> MappingProxyType, list -> tuple (рекурсивно)."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
 
 def retry_with_backoff(
     max_retries: int = 3, base_delay: float = 1.0, exceptions: tuple = (aiohttp.ClientError, asyncio.TimeoutError)
@@ -135,6 +149,18 @@ class OpenDotaService:
 
     HEROES: Dict[int, str] = {}  # Загрузится при первом запросе
 
+    # Сколько секунд живут закэшированные ответы API (по эндпоинтам)
+    LIVE_CACHE_TTL = 30  # /live меняется постоянно
+    RECENT_MATCHES_CACHE_TTL = 60
+    PROFILE_CACHE_TTL = 600  # ник и ранг меняются редко
+    HEROES_CACHE_TTL = 3600
+    # Максимум ответов в кэше, при переполнении вытесняется самый старый
+    RESPONSE_CACHE_SIZE = 1000
+
+    # Пул соединений: keep-alive, чтобы не делать TCP+TLS хендшейк на каждый запрос
+    CONNECTION_LIMIT = 100
+    KEEPALIVE_TIMEOUT = 60
+
     def __init__(self, steam_api_key: Optional[str] = None):
         self._session: Optional[aiohttp.ClientSession] = None
         self._session_lock = asyncio.Lock()
@@ -142,21 +168,28 @@ class OpenDotaService:
         self._rate_lock = asyncio.Lock()
         self.failed_requests: int = 0  # Счетчик проваленных запросов
         self._steam_api_key = steam_api_key  # Для резолва vanity URL
+        # endpoint -> (момент истечения по time.monotonic(), ответ)
+        self._response_cache: Dict[str, Tuple[float, Any]] = {}
+        # endpoint -> запрос в полёте, его ждут все одновременные вызовы
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Создаёт HTTP сессию с общим пулом keep-alive соединений."""
+        connector = aiohttp.TCPConnector(limit=self.CONNECTION_LIMIT, keepalive_timeout=self.KEEPALIVE_TIMEOUT)
+        return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30))
 
     async def init(self) -> None:
         """Инициализирует HTTP сессию заранее."""
         async with self._session_lock:
             if self._session is None:
-                timeout = aiohttp.ClientTimeout(total=30)
-                self._session = aiohttp.ClientSession(timeout=timeout)
+                self._session = self._create_session()
                 logger.info("OpenDota HTTP session initialized")
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Получает HTTP сессию (создает если нужно)."""
         async with self._session_lock:
             if self._session is None:
-                timeout = aiohttp.ClientTimeout(total=30)
-                self._session = aiohttp.ClientSession(timeout=timeout)
+                self._session = self._create_session()
                 logger.info("OpenDota HTTP session created")
             return self._session
 
@@ -188,10 +221,11 @@ class OpenDotaService:
             logger.info("OpenDota HTTP session closed")
 
     @retry_with_backoff(max_retries=3, base_delay=1.0)
-    async def _fetch_with_retry(self, endpoint: str) -> Optional[Dict[str, Any]]:
+    async def _fetch_with_retry(self, endpoint: str) -> Any:
         """
         Внутренний метод для запроса с retry логикой.
         Пробрасывает исключения для обработки декоратором.
+        На 5xx и 429 возвращает _UNAVAILABLE, на 404 и прочие ошибки — None.
         """
         # Валидация endpoint
         if not endpoint.startswith("/"):
@@ -210,6 +244,9 @@ class OpenDotaService:
                 return await resp.json()
             elif resp.status == 404:
                 return None
+            elif resp.status == 429 or resp.status >= 500:
+                logger.warning(f"OpenDota API unavailable: {resp.status}")
+                return _UNAVAILABLE
             else:
                 logger.warning(f"OpenDota API error: {resp.status}")
                 return None
@@ -223,6 +260,11 @@ class OpenDotaService:
         - Exponential backoff: 1s, 2s, 4s
         - Graceful degradation: возвращает None при провале всех попыток
         """
+        data = await self._fetch_raw(endpoint)
+        return None if data is _UNAVAILABLE else data
+
+    async def _fetch_raw(self, endpoint: str) -> Any:
+        """То же, что _fetch, но сбой сети, 5xx и 429 возвращают _UNAVAILABLE вместо None."""
         try:
             return await self._fetch_with_retry(endpoint)
         except (aiohttp.ClientError, asyncio.TimeoutError) as e:
@@ -231,19 +273,58 @@ class OpenDotaService:
                 f"All retry attempts failed for endpoint {endpoint}: {e}\n" f"Traceback:\n{traceback.format_exc()}"
             )
             self.failed_requests += 1
-            return None
+            return _UNAVAILABLE
         except Exception as e:
             # Неожиданные исключения логируем и возвращаем None
             logger.error(f"Unexpected error in OpenDota request: {e}\n{traceback.format_exc()}")
             self.failed_requests += 1
             return None
 
+    async def _fetch_cached(self, endpoint: str, ttl: float) -> Optional[Any]:
+        """
+        Запрос к API с кэшем ответа на ttl секунд.
+
+        - Одновременные запросы одного endpoint сливаются в один HTTP-запрос
+        - Если API недоступен (сеть, 5xx, 429), отдаётся устаревший ответ из кэша (если он есть).
+          Ответ "данных нет" (404 и т.п.) устаревшим ответом не подменяется
+
+        Один и тот же ответ отдаётся всем вызывающим, поэтому он неизменяемый:
+        dict приходит как MappingProxyType, list — как tuple. Изменять его нельзя.
+        """
+        cached = self._response_cache.get(endpoint)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        future = self._inflight.get(endpoint)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_raw(endpoint))
+            self._inflight[endpoint] = future
+            future.add_done_callback(lambda _: self._inflight.pop(endpoint, None))
+
+        # shield: отмена одного ожидающего не должна отменять запрос для остальных
+        data = await asyncio.shield(future)
+
+        if data is _UNAVAILABLE:
+            return cached[1] if cached else None
+        if data is None:
+            # Данных больше нет (например, аккаунт скрыт) — устаревший ответ не нужен
+            self._response_cache.pop(endpoint, None)
+            return None
+
+        data = _freeze(data)
+        if endpoint not in self._response_cache and len(self._response_cache) >= self.RESPONSE_CACHE_SIZE:
+            # dict хранит порядок вставки — первый ключ самый старый
+            self._response_cache.pop(next(iter(self._response_cache)))
+        self._response_cache[endpoint] = (time.monotonic() + ttl, data)
+        return data
+
     async def _load_heroes(self) -> None:
         """Загружает список героев."""
         if self.HEROES:
             return
 
-        data = await self._fetch("/heroes")
+        # Через кэш: одновременные первые команды после старта не грузят список героев каждая сама
+        data = await self._fetch_cached("/heroes", self.HEROES_CACHE_TTL)
         if data:
             self.HEROES = {h["id"]: h["localized_name"] for h in data}
 
@@ -252,7 +333,7 @@ class OpenDotaService:
 
     async def get_profile(self, account_id: int) -> Optional[PlayerProfile]:
         """Получает профиль игрока."""
-        data = await self._fetch(f"/players/{account_id}")
+        data = await self._fetch_cached(f"/players/{account_id}", self.PROFILE_CACHE_TTL)
         if not data or "profile" not in data:
             return None
 
@@ -278,7 +359,7 @@ class OpenDotaService:
         # 3. Парсинг через /live
 
         # Попробуем через /live — там все текущие матчи
-        data = await self._fetch("/live")
+        data = await self._fetch_cached("/live", self.LIVE_CACHE_TTL)
         if not data:
             return None
 
@@ -305,7 +386,7 @@ class OpenDotaService:
         """Получает последний матч игрока (базовая инфа)."""
         await self._load_heroes()
 
-        data = await self._fetch(f"/players/{account_id}/recentMatches")
+        data = await self._fetch_cached(f"/players/{account_id}/recentMatches", self.RECENT_MATCHES_CACHE_TTL)
         if not data or len(data) == 0:
             return None
 
@@ -327,8 +408,8 @@ class OpenDotaService:
         """Получает детальную стату последнего матча."""
         await self._load_heroes()
 
-        # Сначала получаем ID последнего матча
-        recent = await self._fetch(f"/players/{account_id}/recentMatches")
+        # Сначала получаем ID последнего матча (тот же кэш, что у get_last_match: /lastgame и /last идут подряд)
+        recent = await self._fetch_cached(f"/players/{account_id}/recentMatches", self.RECENT_MATCHES_CACHE_TTL)
         if not recent or len(recent) == 0:
             return None
 
@@ -398,13 +479,17 @@ class OpenDotaService:
         }
 
     async def get_wordcloud(self, account_id: int) -> Optional[Dict[str, int]]:
-        """Получает wordcloud игрока (что пишет в чат)."""
+        """Получает wordcloud игрока (что пишет в чат), слова в нижнем регистре."""
         data = await self._fetch(f"/players/{account_id}/wordcloud")
         if not data:
             return None
 
         # API возвращает {"my_word_counts": {...}, "all_word_counts": {...}}
-        words = data.get("my_word_counts", {})
+        # Ключи приводим к нижнему регистру один раз здесь, "GG" и "gg" считаются одним словом
+        words: Dict[str, int] = {}
+        for word, count in data.get("my_word_counts", {}).items():
+            word = word.lower()
+            words[word] = words.get(word, 0) + count
         return words if words else None
 
     async def get_recent_match_id(self, account_id: int) -> Optional[int]:
@@ -101,18 +101,14 @@ class ShameService:
 
     async def _check_all_subscribers(self) -> None:
         """Проверяет всех подписчиков на новые матчи."""
-        chats = await self.steam_repo.get_all_shame_chats()
+        # Один запрос на все чаты вместо запроса на каждый чат
+        subscribers_by_chat = await self.steam_repo.get_all_shame_subscribers()
 
-        for chat_id in chats:
-            await self._check_chat_subscribers(chat_id)
+        for chat_id, subscribers in subscribers_by_chat.items():
+            await self._check_chat_subscribers(chat_id, subscribers)
 
-    async def _check_chat_subscribers(self, chat_id: int) -> None:
+    async def _check_chat_subscribers(self, chat_id: int, subscribers: List[tuple]) -> None:
         """Проверяет подписчиков конкретного чата."""
-        subscribers = await self.steam_repo.get_shame_subscribers(chat_id)
-
-        if not subscribers:
-            return
-
         # Группируем по матчам — если несколько друзей в одном матче
         match_players: Dict[int, List[tuple]] = {}
 
@@ -170,8 +166,7 @@ class ShameService:
             return
 
         # Обновляем last_match_id в БД для всех участников
-        for user_id, _ in players:
-            await self.steam_repo.update_last_match(user_id, chat_id, match_id)
+        await self.steam_repo.update_last_matches((user_id, chat_id, match_id) for user_id, _ in players)
 
         # Отправляем shame сообщение
         await self._send_shame(chat_id, worst_user_id, worst, match_data)
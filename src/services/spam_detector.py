@@ -54,15 +54,16 @@ class SpamDetector:
 
     def _get_limits(self, settings: Dict[str, Any], spam_type: SpamType) -> tuple[int, int]:
         """Возвращает (limit, window) для типа спама."""
-        type_map = {
-            SpamType.STICKER: ("sticker_limit", "sticker_window"),
-            SpamType.ANIMATION: ("sticker_limit", "sticker_window"),
-            SpamType.TEXT: ("text_limit", "text_window"),
-            SpamType.PHOTO: ("image_limit", "image_window"),
-            SpamType.VIDEO: ("video_limit", "video_window"),
-        }
-        limit_key, window_key = type_map[spam_type]
-        return settings[limit_key], settings[window_key]
+        match spam_type:
+            case SpamType.STICKER | SpamType.ANIMATION:
+                return settings["sticker_limit"], settings["sticker_window"]
+            case SpamType.TEXT:
+                return settings["text_limit"], settings["text_window"]
+            case SpamType.PHOTO:
+                return settings["image_limit"], settings["image_window"]
+            case SpamType.VIDEO:
+                return settings["video_limit"], settings["video_window"]
+        raise KeyError(spam_type)
 
     async def check(
         self, user_id: int, chat_id: int, spam_type: SpamType, content_hash: Optional[str] = None
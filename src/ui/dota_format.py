@@ -0,0 +1,58 @@
+"""
+Общие данные и форматирование для Dota-ответов (/toxic, /last и меню 🎮 Dota).
+"""
+
+import bisect
+
+# Слова, по которым считается "токсичность". Сравниваются со словами
+# из OpenDotaService.get_wordcloud, которые уже в нижнем регистре
+TOXIC_WORDS = frozenset(
+    {
+        "gg",
+        "ez",
+        "noob",
+        "report",
+        "trash",
+        "bad",
+        "wtf",
+        "fuck",
+        "shit",
+        "idiot",
+        "stupid",
+        "dog",
+        "animal",
+        "cyka",
+        "blyat",
+        "сука",
+        "блять",
+        "gg ez",
+    }
+)
+
+# Рейтинг токсичности: пороги в процентах по возрастанию и названия (на одно больше порогов).
+# Рейтинг выбирается, когда процент строго больше порога
+_TOXIC_THRESHOLDS = (5, 10, 20)
+_TOXIC_LABELS = ("😇 Почти ангел", "😤 Немного солёный", "🔥 Токсичный", "☢️ ЯДЕРНЫЙ ТОКСИК")
+
+# Места в топе слов
+MEDALS = ("🥇", "🥈", "🥉", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟")
+
+
+def toxic_rating(percent: float) -> str:
+    """Название рейтинга для процента токсичных слов."""
+    # bisect_left считает пороги строго меньше процента
+    return _TOXIC_LABELS[bisect.bisect_left(_TOXIC_THRESHOLDS, percent)]
+
+
+# Ранг в команде -> эмодзи для 1..10 (в команде 5 игроков, запас на всякий случай)
+_RANK_EMOJI = ("#0", "🥇", "🥈", "🥉") + tuple(f"#{i}" for i in range(4, 11))
+
+
+def rank_emoji(rank: int) -> str:
+    """Эмодзи места в команде: медаль для топ-3, иначе #N."""
+    return _RANK_EMOJI[rank] if 0 <= rank < len(_RANK_EMOJI) else f"#{rank}"
+
+
+def fmt(n: int) -> str:
+    """Сокращает большие числа: 12345 -> 12.3k."""
+    return f"{n / 1000:.1f}k" if n >= 1000 else str(n)
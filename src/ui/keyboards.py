@@ -2,17 +2,27 @@
 Клавиатуры и кнопки бота.
 """
 
+from functools import lru_cache
+
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
+# Сколько готовых клавиатур каждого вида хранить. InlineKeyboardMarkup неизменяем
+# после создания, поэтому одну и ту же разметку можно отдавать на каждое нажатие.
+_MARKUP_CACHE_SIZE = 1024
+
 
 class Keyboards:
     """Фабрика клавиатур."""
 
+    # Пользователей белого списка на одной странице
+    WHITELIST_PAGE_SIZE = 8
+
     # ═══════════════════════════════════════════════════════════
     # 🏠 ГЛАВНОЕ МЕНЮ
     # ═══════════════════════════════════════════════════════════
 
     @staticmethod
+    @lru_cache(maxsize=_MARKUP_CACHE_SIZE)
     def main_menu(owner_id: int) -> InlineKeyboardMarkup:
         """Главное меню бота."""
         return InlineKeyboardMarkup(
@@ -88,14 +98,16 @@ class Keyboards:
         Returns:
             InlineKeyboardMarkup или list с кнопкой назад
         """
-        button = [InlineKeyboardButton("◀️ Назад", callback_data=callback)]
-        return InlineKeyboardMarkup([button]) if as_markup else button
+        if as_markup:
+            return _back_markup(callback)
+        return [InlineKeyboardButton("◀️ Назад", callback_data=callback)]
 
     # ═══════════════════════════════════════════════════════════
     # ⚙️ НАСТРОЙКИ
     # ═══════════════════════════════════════════════════════════
 
     @staticmethod
+    @lru_cache(maxsize=_MARKUP_CACHE_SIZE)
     def settings_menu(owner_id: int) -> InlineKeyboardMarkup:
         """Меню настроек."""
         return InlineKeyboardMarkup(
@@ -116,6 +128,7 @@ class Keyboards:
         )
 
     @staticmethod
+    @lru_cache(maxsize=_MARKUP_CACHE_SIZE)
     def setting_adjust(setting_type: str, current_limit: int, owner_id: int) -> InlineKeyboardMarkup:
         """Кнопки изменения лимита."""
         return InlineKeyboardMarkup(
@@ -136,6 +149,7 @@ class Keyboards:
         )
 
     @staticmethod
+    @lru_cache(maxsize=_MARKUP_CACHE_SIZE)
     def warning_toggle(enabled: bool, owner_id: int) -> InlineKeyboardMarkup:
         """Переключатель предупреждений."""
         status = "✅ Включены" if enabled else "❌ Выключены"
@@ -233,13 +247,14 @@ class Keyboards:
 
     @staticmethod
     def whitelist_menu(users: list, page: int = 0, owner_id: int = None) -> InlineKeyboardMarkup:
-        """Меню белого списка с пагинацией."""
+        """Меню белого списка с пагинацией.
+
+        users — все пары (user_id, имя); имена читаются только у видимой страницы.
+        """
         buttons = []
 
-        # Пагинация: 8 пользователей на страницу
-        page_size = 8
-        start_idx = page * page_size
-        end_idx = start_idx + page_size
+        start_idx = page * Keyboards.WHITELIST_PAGE_SIZE
+        end_idx = start_idx + Keyboards.WHITELIST_PAGE_SIZE
         page_users = users[start_idx:end_idx]
 
         for user_id, name in page_users:
@@ -291,6 +306,7 @@ class Keyboards:
     # ═══════════════════════════════════════════════════════════
 
     @staticmethod
+    @lru_cache(maxsize=_MARKUP_CACHE_SIZE)
     def stats_period(owner_id: int) -> InlineKeyboardMarkup:
         """Выбор периода статистики."""
         return InlineKeyboardMarkup(
@@ -313,3 +329,9 @@ class Keyboards:
                 Keyboards.back_button("menu_top"),
             ]
         )
+
+
+@lru_cache(maxsize=_MARKUP_CACHE_SIZE)
+def _back_markup(callback: str) -> InlineKeyboardMarkup:
+    """Готовая разметка с одной кнопкой "Назад"."""
+    return InlineKeyboardMarkup([[InlineKeyboardButton("◀️ Назад", callback_data=callback)]])
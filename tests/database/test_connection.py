@@ -0,0 +1,98 @@
+"""
+Tests for Database connection lifecycle.
+"""
+import aiosqlite
+import pytest
+
+from src.database import Database
+
+
+class TestDatabaseMaintenance:
+    """Тесты обслуживания БД."""
+
+    async def test_init_starts_maintenance_task(self, db: Database):
+        """init() должен запускать фоновое обслуживание."""
+        assert db._maintenance_task is not None
+        assert not db._maintenance_task.done()
+
+    async def test_optimize_runs_on_open_connection(self, db: Database):
+        """optimize() не должен падать на рабочей БД."""
+        await db.optimize()
+
+        async with db.connection() as conn:
+            cursor = await conn.execute("SELECT 1")
+            assert (await cursor.fetchone())[0] == 1
+
+    async def test_close_stops_maintenance_task(self, tmp_path):
+        """close() должен останавливать обслуживание и закрывать соединение."""
+        database = Database(str(tmp_path / "close.db"))
+        await database.init()
+        task = database._maintenance_task
+
+        await database.close()
+
+        assert task.done()
+        assert database._maintenance_task is None
+        with pytest.raises(RuntimeError):
+            async with database.connection():
+                pass
+
+
+class TestDatabasePragmas:
+    """Тесты настроек соединения."""
+
+    async def test_init_enables_wal(self, db: Database):
+        """init() должен включать WAL для файловой БД."""
+        async with db.connection() as conn:
+            cursor = await conn.execute("PRAGMA journal_mode")
+            assert (await cursor.fetchone())[0] == "wal"
+
+    async def test_init_sets_synchronous_normal(self, db: Database):
+        """init() должен выставлять synchronous=NORMAL."""
+        async with db.connection() as conn:
+            cursor = await conn.execute("PRAGMA synchronous")
+            assert (await cursor.fetchone())[0] == 1
+
+
+class TestDatabaseReaders:
+    """Тесты пула соединений только для чтения."""
+
+    async def test_memory_db_reads_through_writer(self):
+        """Для :memory: пула нет, чтение идёт через основное соединение."""
+        database = Database(":memory:")
+        await database.init()
+        try:
+            assert database._readers == []
+            async with database.read_connection() as conn:
+                assert conn is database._conn
+        finally:
+            await database.close()
+
+    async def test_reader_sees_committed_writes(self, db: Database):
+        """Читатель должен видеть данные, закоммиченные писателем."""
+        async with db.connection() as conn:
+            await conn.execute("INSERT INTO whitelist (user_id, chat_id, added_at) VALUES (1, -100, 0)")
+
+        async with db.read_connection() as conn:
+            assert conn is not db._conn
+            cursor = await conn.execute("SELECT COUNT(*) FROM whitelist")
+            assert (await cursor.fetchone())[0] == 1
+
+    async def test_reader_is_query_only(self, db: Database):
+        """Запись через читателя должна быть запрещена."""
+        async with db.read_connection() as conn:
+            with pytest.raises(aiosqlite.OperationalError):
+                await conn.execute("INSERT INTO whitelist (user_id, chat_id, added_at) VALUES (1, -100, 0)")
+
+    async def test_close_closes_readers(self, tmp_path):
+        """close() должен закрывать пул читателей."""
+        database = Database(str(tmp_path / "close.db"))
+        await database.init()
+        assert len(database._readers) == Database.READ_POOL_SIZE
+
+        await database.close()
+
+        assert database._readers == []
+        with pytest.raises(RuntimeError):
+            async with database.read_connection():
+                pass
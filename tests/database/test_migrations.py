@@ -0,0 +1,88 @@
+"""
+Tests for schema migrations.
+"""
+import time
+from datetime import datetime, timedelta
+
+import aiosqlite
+
+from src.database.migrations import MIGRATIONS
+from src.database.migrations_manager import MigrationManager
+
+
+class TestIntegerTimestampsMigration:
+    """Тесты миграции 004: ISO-строки -> INTEGER epoch."""
+
+    async def test_upgrade_converts_iso_timestamps(self, tmp_path):
+        """upgrade() должен переводить ISO-строки в epoch с сохранением момента времени."""
+        async with aiosqlite.connect(str(tmp_path / "legacy.db")) as conn:
+            manager = MigrationManager(conn)
+            await manager.migrate_to_latest(MIGRATIONS[:3])
+
+            until = datetime.now() + timedelta(hours=1)
+            await conn.execute(
+                "INSERT INTO violations (user_id, chat_id, count, last_violation, banned_until) VALUES (?, ?, ?, ?, ?)",
+                (1, -100, 2, datetime.now().isoformat(), until.isoformat()),
+            )
+            await conn.execute(
+                "INSERT INTO spam_records (user_id, chat_id, spam_type, timestamp) VALUES (?, ?, ?, ?)",
+                (1, -100, "sticker", datetime.now().isoformat()),
+            )
+            await conn.commit()
+
+            await manager.migrate_to_latest(MIGRATIONS)
+
+            cursor = await conn.execute("SELECT count, banned_until, typeof(banned_until) FROM violations")
+            count, banned_until, kind = await cursor.fetchone()
+            assert count == 2
+            assert kind == "integer"
+            assert abs(banned_until - int(until.timestamp())) <= 1
+
+            cursor = await conn.execute("SELECT timestamp FROM spam_records")
+            (timestamp,) = await cursor.fetchone()
+            assert abs(timestamp - int(time.time())) <= 5
+
+    async def test_upgrade_keeps_partial_index(self, tmp_path):
+        """upgrade() должен пересоздавать индексы пересобранных таблиц."""
+        async with aiosqlite.connect(str(tmp_path / "fresh.db")) as conn:
+            await MigrationManager(conn).migrate_to_latest(MIGRATIONS)
+
+            cursor = await conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+            indexes = {row[0] for row in await cursor.fetchall()}
+
+            assert "idx_violations_banned" in indexes
+
+
+class TestCoveringIndexesMigration:
+    """Тесты миграции 005: покрывающие индексы."""
+
+    async def _plan(self, conn: aiosqlite.Connection, sql: str, params: tuple) -> str:
+        cursor = await conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return " ".join(row[3] for row in await cursor.fetchall())
+
+    async def test_count_recent_uses_covering_index(self, tmp_path):
+        """Подсчёт спама должен идти только по индексу idx_spam_lookup."""
+        async with aiosqlite.connect(str(tmp_path / "plan.db")) as conn:
+            await MigrationManager(conn).migrate_to_latest(MIGRATIONS)
+
+            plan = await self._plan(
+                conn,
+                "SELECT COUNT(*) FROM spam_records WHERE user_id = ? AND chat_id = ? "
+                "AND spam_type = ? AND timestamp >= ? AND content_hash = ?",
+                (1, -100, "text", 0, "hash"),
+            )
+
+            assert "COVERING INDEX idx_spam_lookup" in plan
+
+    async def test_ban_stats_uses_covering_index(self, tmp_path):
+        """Выборка статистики банов должна идти только по индексу idx_ban_stats_chat_ts."""
+        async with aiosqlite.connect(str(tmp_path / "plan.db")) as conn:
+            await MigrationManager(conn).migrate_to_latest(MIGRATIONS)
+
+            plan = await self._plan(
+                conn,
+                "SELECT ban_type, user_id, ban_minutes FROM ban_stats WHERE chat_id = ? AND timestamp > ?",
+                (-100, 0),
+            )
+
+            assert "COVERING INDEX idx_ban_stats_chat_ts" in plan
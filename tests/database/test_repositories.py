@@ -1,11 +1,12 @@
 """
 Integration tests for database repositories.
-Тесты для SpamRepository, ViolationRepository, WhitelistRepository, ChatSettingsRepository.
+Тесты для SpamRepository, ViolationRepository, WhitelistRepository, ChatSettingsRepository, BanStatsRepository.
 """
 import pytest
 from datetime import datetime, timedelta
 
 from src.database import (
+    BanStatsRepository,
     Database,
     SpamRepository,
     ViolationRepository,
@@ -123,6 +124,26 @@ class TestSpamRepository:
         count = await repo.count_recent(999, -100999, "sticker", window_seconds=60)
         assert count == 0
 
+    async def test_add_and_count_recent_includes_new_record(self, repo: SpamRepository):
+        """add_and_count_recent() должен учитывать только что добавленную запись."""
+        user_id, chat_id = 123, -100123
+
+        count1 = await repo.add_and_count_recent(user_id, chat_id, "sticker", window_seconds=60)
+        count2 = await repo.add_and_count_recent(user_id, chat_id, "sticker", window_seconds=60)
+
+        assert count1 == 1
+        assert count2 == 2
+
+    async def test_add_and_count_recent_filters_by_content_hash(self, repo: SpamRepository):
+        """add_and_count_recent() с content_hash должен считать только совпадающие."""
+        user_id, chat_id = 123, -100123
+
+        await repo.add_and_count_recent(user_id, chat_id, "text", 60, content_hash="hash1")
+        await repo.add_and_count_recent(user_id, chat_id, "text", 60, content_hash="hash2")
+        count = await repo.add_and_count_recent(user_id, chat_id, "text", 60, content_hash="hash1")
+
+        assert count == 2
+
     async def test_clear_user_removes_all_records(self, repo: SpamRepository):
         """clear_user() должен удалять все записи пользователя в чате."""
         user_id, chat_id = 123, -100123
@@ -171,6 +192,21 @@ class TestSpamRepository:
         assert count_chat1 == 0
         assert count_chat2 == 1
 
+    async def test_cleanup_old_records_deletes_in_batches(self, repo: SpamRepository, db: Database, monkeypatch):
+        """cleanup_old_records() должен удалять все старые записи пачками и не трогать свежие."""
+        monkeypatch.setattr(SpamRepository, "CLEANUP_BATCH_SIZE", 2)
+        async with db.connection() as conn:
+            await conn.executemany(
+                "INSERT INTO spam_records (user_id, chat_id, spam_type, timestamp) VALUES (?, ?, ?, ?)",
+                [(i, -100123, "text", 1000) for i in range(5)],
+            )
+        await repo.add_record(123, -100123, "text")
+
+        deleted = await repo.cleanup_old_records(hours=1)
+
+        assert deleted == 5
+        assert await repo.count_recent(123, -100123, "text", window_seconds=60) == 1
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # VIOLATION REPOSITORY TESTS
@@ -204,6 +240,17 @@ class TestViolationRepository:
         assert count2 == 2
         assert count3 == 3
 
+    async def test_increment_and_get_increments_counter(self, repo: ViolationRepository):
+        """increment_and_get() должен создавать запись и инкрементировать счётчик."""
+        user_id, chat_id = 123, -100123
+
+        count1 = await repo.increment_and_get(user_id, chat_id, ban_minutes=10)
+        count2 = await repo.increment_and_get(user_id, chat_id, ban_minutes=60)
+
+        assert count1 == 1
+        assert count2 == 2
+        assert await repo.is_banned(user_id, chat_id) is True
+
     async def test_get_info_returns_count_and_banned_until(self, repo: ViolationRepository):
         """get_info() должен возвращать (count, banned_until)."""
         user_id, chat_id = 123, -100123
@@ -565,3 +612,123 @@ class TestChatSettingsRepository:
         await repo.set(chat_id, "warning_enabled", 0)
         settings = await repo.get(chat_id)
         assert settings["warning_enabled"] is False
+
+    async def test_get_is_cached(self, repo: ChatSettingsRepository, db: Database):
+        """get() должен отдавать настройки из кэша без запроса к БД."""
+        chat_id = -100123
+        await repo.set(chat_id, "sticker_limit", 5)
+        assert (await repo.get(chat_id))["sticker_limit"] == 5
+
+        # Меняем значение в обход репозитория — кэш его не видит
+        async with db.connection() as conn:
+            await conn.execute("UPDATE chat_settings SET sticker_limit = 7 WHERE chat_id = ?", (chat_id,))
+
+        assert (await repo.get(chat_id))["sticker_limit"] == 5
+
+    async def test_set_invalidates_cache(self, repo: ChatSettingsRepository):
+        """set() должен сбрасывать кэш чата."""
+        chat_id = -100123
+        assert (await repo.get(chat_id))["sticker_limit"] == 3
+
+        await repo.set(chat_id, "sticker_limit", 8)
+
+        assert (await repo.get(chat_id))["sticker_limit"] == 8
+
+    async def test_set_updates_cached_settings(self, repo: ChatSettingsRepository, db: Database):
+        """set() должен обновлять закэшированные настройки без повторного чтения из БД."""
+        chat_id = -100123
+        await repo.set(chat_id, "text_limit", 4)
+        await repo.get(chat_id)
+
+        # Меняем другое поле в обход репозитория — кэш его не видит
+        async with db.connection() as conn:
+            await conn.execute("UPDATE chat_settings SET text_window = 99 WHERE chat_id = ?", (chat_id,))
+
+        await repo.set(chat_id, "warning_enabled", 0)
+        settings = await repo.get(chat_id)
+
+        assert settings["warning_enabled"] is False
+        assert settings["text_limit"] == 4
+        assert settings["text_window"] == 20  # Из кэша, БД не перечитывалась
+
+    async def test_cached_settings_are_copied(self, repo: ChatSettingsRepository):
+        """Изменение возвращённого словаря не должно портить кэш."""
+        settings = await repo.get(-100123)
+        settings["sticker_limit"] = 999
+
+        assert (await repo.get(-100123))["sticker_limit"] == 3
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAN STATS REPOSITORY TESTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestBanStatsRepository:
+    """Тесты для BanStatsRepository."""
+
+    async def test_get_stats_empty_chat(self, ban_stats_repo: BanStatsRepository):
+        """get_stats() для чата без банов должен возвращать нули."""
+        stats = await ban_stats_repo.get_stats(-100123)
+
+        assert stats["total_bans"] == 0
+        assert stats["by_type"] == {}
+        assert stats["top_violators"] == []
+        assert stats["total_ban_minutes"] == 0
+
+    async def test_get_stats_aggregates(self, ban_stats_repo: BanStatsRepository):
+        """get_stats() должен считать все агрегаты за один проход."""
+        chat_id = -100123
+        await ban_stats_repo.record_ban(1, chat_id, "sticker", 5)
+        await ban_stats_repo.record_ban(1, chat_id, "text", 15)
+        await ban_stats_repo.record_ban(2, chat_id, "sticker", 10)
+        await ban_stats_repo.record_ban(3, -100999, "sticker", 60)  # Другой чат
+
+        stats = await ban_stats_repo.get_stats(chat_id)
+
+        assert stats["total_bans"] == 3
+        assert stats["by_type"] == {"sticker": 2, "text": 1}
+        assert list(stats["by_type"]) == ["sticker", "text"]
+        assert stats["top_violators"] == [(1, 2), (2, 1)]
+        assert stats["total_ban_minutes"] == 30
+
+    async def test_get_stats_is_cached(self, ban_stats_repo: BanStatsRepository, db: Database):
+        """get_stats() должен отдавать статистику из кэша без запроса к БД."""
+        chat_id = -100123
+        await ban_stats_repo.record_ban(1, chat_id, "sticker", 5)
+        assert (await ban_stats_repo.get_stats(chat_id))["total_bans"] == 1
+
+        # Удаляем запись в обход репозитория — кэш этого не видит
+        async with db.connection() as conn:
+            await conn.execute("DELETE FROM ban_stats WHERE chat_id = ?", (chat_id,))
+
+        assert (await ban_stats_repo.get_stats(chat_id))["total_bans"] == 1
+        assert (await ban_stats_repo.get_stats(chat_id, days=1))["total_bans"] == 0
+
+    async def test_get_stats_returns_independent_copy(self, ban_stats_repo: BanStatsRepository):
+        """Изменение результата get_stats() не должно портить кэш."""
+        chat_id = -100123
+        await ban_stats_repo.record_ban(1, chat_id, "sticker", 5)
+
+        stats = await ban_stats_repo.get_stats(chat_id)
+        stats["by_type"]["sticker"] = 100
+        stats["top_violators"].append((2, 50))
+        stats["total_bans"] = 0
+
+        cached = await ban_stats_repo.get_stats(chat_id)
+        assert cached["by_type"] == {"sticker": 1}
+        assert cached["top_violators"] == [(1, 1)]
+        assert cached["total_bans"] == 1
+
+    async def test_record_ban_invalidates_chat_stats(self, ban_stats_repo: BanStatsRepository):
+        """record_ban() должен сбрасывать кэш статистики своего чата за все периоды."""
+        chat_id = -100123
+        other_chat_id = -100999
+        assert (await ban_stats_repo.get_stats(chat_id, days=1))["total_bans"] == 0
+        assert (await ban_stats_repo.get_stats(chat_id, days=30))["total_bans"] == 0
+        assert (await ban_stats_repo.get_stats(other_chat_id))["total_bans"] == 0
+
+        await ban_stats_repo.record_ban(1, chat_id, "sticker", 5)
+
+        assert (await ban_stats_repo.get_stats(chat_id, days=1))["total_bans"] == 1
+        assert (await ban_stats_repo.get_stats(chat_id, days=30))["total_bans"] == 1
+        assert (await ban_stats_repo.get_stats(other_chat_id))["total_bans"] == 0
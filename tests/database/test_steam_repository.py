@@ -86,6 +86,36 @@ class TestSteamLinkRepository:
 
         assert result is None
 
+    async def test_get_account_id_is_cached(self, repo: SteamLinkRepository, db: Database):
+        """get_account_id() должен отдавать привязку из кэша без запроса к БД."""
+        await repo.link(123, 111111)
+        assert await repo.get_account_id(123) == 111111
+
+        # Меняем значение в обход репозитория — кэш его не видит
+        async with db.connection() as conn:
+            await conn.execute("UPDATE steam_links SET account_id = 222222 WHERE user_id = 123")
+
+        assert await repo.get_account_id(123) == 111111
+
+    async def test_link_and_unlink_invalidate_account_cache(self, repo: SteamLinkRepository):
+        """link() и unlink() должны сбрасывать кэш привязки пользователя."""
+        assert await repo.get_account_id(123) is None
+
+        await repo.link(123, 111111)
+        assert await repo.get_account_id(123) == 111111
+
+        await repo.unlink(123)
+        assert await repo.get_account_id(123) is None
+
+    async def test_account_cache_is_bounded(self, repo: SteamLinkRepository, monkeypatch):
+        """Кэш привязок не должен расти больше ACCOUNT_CACHE_SIZE."""
+        monkeypatch.setattr(SteamLinkRepository, "ACCOUNT_CACHE_SIZE", 2)
+
+        for user_id in (1, 2, 3):
+            await repo.get_account_id(user_id)
+
+        assert list(repo._account_cache) == [2, 3]
+
     async def test_get_all_linked_returns_all_entries(self, repo: SteamLinkRepository):
         """get_all_linked() должен возвращать все привязки."""
         await repo.link(111, 11111111, "Player1")
@@ -180,6 +210,31 @@ class TestShameSubscriptions:
         assert await repo.is_shame_subscribed(user_id, -100111) is True
         assert await repo.is_shame_subscribed(user_id, -100222) is False
 
+    async def test_get_dota_status_linked_and_subscribed(self, repo: SteamLinkRepository):
+        """get_dota_status() должен возвращать привязку и подписку в чате."""
+        await repo.link(123, 87654321)
+        await repo.subscribe_shame(123, -100123)
+
+        assert await repo.get_dota_status(123, -100123) == (87654321, True)
+        assert await repo.get_dota_status(123, -100999) == (87654321, False)
+
+    async def test_get_dota_status_ignores_subscription_without_link(self, repo: SteamLinkRepository):
+        """Подписка без привязки Steam не должна учитываться."""
+        await repo.subscribe_shame(123, -100123)
+
+        assert await repo.get_dota_status(123, -100123) == (None, False)
+
+    async def test_get_dota_status_warms_account_cache(self, repo: SteamLinkRepository, db: Database):
+        """get_dota_status() должен класть привязку в кэш get_account_id()."""
+        await repo.link(123, 87654321)
+        await repo.get_dota_status(123, -100123)
+
+        # Удаляем привязку в обход репозитория — кэш этого не видит
+        async with db.connection() as conn:
+            await conn.execute("DELETE FROM steam_links WHERE user_id = ?", (123,))
+
+        assert await repo.get_account_id(123) == 87654321
+
     async def test_get_shame_subscribers_returns_subscribers_with_steam_link(
         self, repo: SteamLinkRepository
     ):
@@ -263,6 +318,21 @@ class TestShameSubscriptions:
 
         assert chats == []
 
+    async def test_get_all_shame_subscribers_groups_by_chat(self, repo: SteamLinkRepository):
+        """get_all_shame_subscribers() должен вернуть подписчиков всех чатов, сгруппированных по chat_id."""
+        await repo.link(111, 11111111)
+        await repo.link(222, 22222222)
+        await repo.subscribe_shame(111, -100111)
+        await repo.subscribe_shame(222, -100111)
+        await repo.subscribe_shame(222, -100222)
+        await repo.subscribe_shame(333, -100222)  # Без привязки Steam
+
+        subscribers = await repo.get_all_shame_subscribers()
+
+        assert set(subscribers) == {-100111, -100222}
+        assert sorted(subscribers[-100111]) == [(111, 11111111, None), (222, 22222222, None)]
+        assert subscribers[-100222] == [(222, 22222222, None)]
+
     async def test_update_last_match_updates_match_id(self, repo: SteamLinkRepository):
         """update_last_match() должен обновлять last_match_id."""
         user_id, chat_id = 123, -100123
@@ -277,6 +347,19 @@ class TestShameSubscriptions:
         assert len(subscribers) == 1
         assert subscribers[0][2] == match_id  # last_match_id
 
+    async def test_update_last_matches_updates_all_rows(self, repo: SteamLinkRepository):
+        """update_last_matches() должен обновлять last_match_id у всех переданных подписок."""
+        chat_id, match_id = -100123, 7654321000
+        await repo.link(111, 11111111)
+        await repo.link(222, 22222222)
+        await repo.subscribe_shame(111, chat_id)
+        await repo.subscribe_shame(222, chat_id)
+
+        await repo.update_last_matches([(111, chat_id, match_id), (222, chat_id, match_id)])
+
+        subscribers = await repo.get_shame_subscribers(chat_id)
+        assert {s[2] for s in subscribers} == {match_id}
+
     async def test_update_last_match_is_chat_specific(self, repo: SteamLinkRepository):
         """update_last_match() должен обновлять только для конкретного чата."""
         user_id = 123
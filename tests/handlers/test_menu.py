@@ -0,0 +1,105 @@
+"""
+Тесты для MenuHandlers.
+"""
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.handlers.menu import MenuHandlers
+
+
+CHAT_ID = -100
+USER_ID = 1
+
+
+@pytest.fixture
+def menu(settings_repo):
+    """MenuHandlers с настоящим репозиторием настроек и коротким debounce."""
+    admin_service = MagicMock()
+    admin_service.is_chat_admin = AsyncMock(return_value=True)
+    handlers = MenuHandlers(
+        ban_service=MagicMock(),
+        admin_service=admin_service,
+        whitelist_repo=MagicMock(),
+        violation_repo=MagicMock(),
+        settings_repo=settings_repo,
+        stats_repo=MagicMock(),
+    )
+    handlers.SETTINGS_DEBOUNCE = 0.01
+    return handlers
+
+
+def make_tap(action: str):
+    """Update с нажатием кнопки изменения лимита стикеров."""
+    update = MagicMock()
+    update.effective_chat.id = CHAT_ID
+    update.effective_user.id = USER_ID
+    update.callback_query.data = f"setting_sticker_{action}_{USER_ID}"
+    update.callback_query.answer = AsyncMock()
+    update.callback_query.edit_message_text = AsyncMock()
+    update.callback_query.message = None
+    return update
+
+
+async def drain(menu: MenuHandlers) -> None:
+    """Ждёт завершения всех отложенных записей."""
+    while menu._flush_tasks:
+        await asyncio.gather(*menu._flush_tasks)
+
+
+class TestSettingsDebounce:
+    """Тесты отложенной записи лимитов из меню настроек."""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_written_once(self, menu, settings_repo, monkeypatch):
+        """Серия быстрых нажатий должна дать одну запись с итоговым значением."""
+        set_mock = AsyncMock(wraps=settings_repo.set)
+        monkeypatch.setattr(settings_repo, "set", set_mock)
+        # Запас, чтобы все нажатия успели до записи даже на медленной машине
+        menu.SETTINGS_DEBOUNCE = 0.2
+
+        for _ in range(4):
+            await menu.handle_settings_callback(make_tap("inc"), MagicMock())
+        await drain(menu)
+
+        set_mock.assert_awaited_once_with(CHAT_ID, "sticker_limit", 7)
+        assert (await settings_repo.get(CHAT_ID))["sticker_limit"] == 7
+
+    @pytest.mark.asyncio
+    async def test_taps_during_write_are_not_lost(self, menu, settings_repo, monkeypatch):
+        """Нажатия во время записи должны считаться от записываемого значения."""
+        original_set = settings_repo.set
+        writing = asyncio.Event()
+
+        async def slow_set(chat_id, key, value):
+            writing.set()
+            await asyncio.sleep(0.05)
+            return await original_set(chat_id, key, value)
+
+        monkeypatch.setattr(settings_repo, "set", slow_set)
+
+        for _ in range(2):
+            await menu.handle_settings_callback(make_tap("inc"), MagicMock())
+        await writing.wait()
+        # Снимок настроек для этих нажатий читается до того, как запись завершилась
+        await asyncio.gather(*(menu.handle_settings_callback(make_tap("inc"), MagicMock()) for _ in range(2)))
+        await drain(menu)
+
+        assert (await settings_repo.get(CHAT_ID))["sticker_limit"] == 7
+        assert not menu._pending_limits
+
+    @pytest.mark.asyncio
+    async def test_failed_write_does_not_block_next_taps(self, menu, settings_repo, monkeypatch):
+        """После ошибки записи следующее нажатие должно запланировать новую запись."""
+        original_set = settings_repo.set
+        monkeypatch.setattr(settings_repo, "set", AsyncMock(side_effect=RuntimeError("db is locked")))
+
+        await menu.handle_settings_callback(make_tap("inc"), MagicMock())
+        await drain(menu)
+
+        monkeypatch.setattr(settings_repo, "set", original_set)
+        await menu.handle_settings_callback(make_tap("dec"), MagicMock())
+        await drain(menu)
+
+        assert (await settings_repo.get(CHAT_ID))["sticker_limit"] == 2
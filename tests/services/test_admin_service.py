@@ -0,0 +1,133 @@
+"""
+Тесты для AdminService.
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from telegram.error import Forbidden, NetworkError
+
+from src.services.admin_service import AdminService
+
+
+@pytest.fixture
+def admin_service(tmp_path):
+    """AdminService без файла админов."""
+    return AdminService(str(tmp_path / "admins.txt"))
+
+
+@pytest.fixture
+def mock_context():
+    """Мок telegram context, get_chat_member возвращает администратора."""
+    context = MagicMock()
+    context.bot.get_chat_member = AsyncMock(return_value=MagicMock(status="administrator"))
+    return context
+
+
+class TestAdminServiceMemberStatusCache:
+    """Тесты кэша статуса участника чата."""
+
+    @pytest.mark.asyncio
+    async def test_status_is_cached(self, admin_service, mock_context):
+        """Повторные проверки не должны ходить в Telegram."""
+        assert await admin_service.is_chat_admin(mock_context, -100, 1) is True
+        assert await admin_service.is_chat_admin(mock_context, -100, 1) is True
+        assert await admin_service.is_chat_owner(mock_context, -100, 1) is False
+
+        mock_context.bot.get_chat_member.assert_awaited_once_with(-100, 1)
+
+    @pytest.mark.asyncio
+    async def test_cache_is_per_chat_and_user(self, admin_service, mock_context):
+        """Кэш должен различать чаты и пользователей."""
+        await admin_service.is_chat_admin(mock_context, -100, 1)
+        await admin_service.is_chat_admin(mock_context, -100, 2)
+        await admin_service.is_chat_admin(mock_context, -200, 1)
+
+        assert mock_context.bot.get_chat_member.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_status_expires(self, admin_service, mock_context, monkeypatch):
+        """После TTL статус должен запрашиваться заново."""
+        monkeypatch.setattr(AdminService, "MEMBER_STATUS_TTL", 0)
+
+        await admin_service.is_chat_admin(mock_context, -100, 1)
+        await admin_service.is_chat_admin(mock_context, -100, 1)
+
+        assert mock_context.bot.get_chat_member.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, admin_service, mock_context):
+        """Ошибка Telegram не должна попадать в кэш."""
+        mock_context.bot.get_chat_member.side_effect = [Forbidden("Bot was kicked"), MagicMock(status="creator")]
+
+        assert await admin_service.is_chat_admin(mock_context, -100, 1) is False
+        assert await admin_service.is_chat_owner(mock_context, -100, 1) is True
+
+    @pytest.mark.asyncio
+    async def test_network_error_is_raised(self, admin_service, mock_context):
+        """Сетевая ошибка по-прежнему пробрасывается наверх."""
+        mock_context.bot.get_chat_member.side_effect = NetworkError("timeout")
+
+        with pytest.raises(NetworkError):
+            await admin_service.is_chat_admin(mock_context, -100, 1)
+
+    @pytest.mark.asyncio
+    async def test_pushed_status_replaces_cached(self, admin_service, mock_context):
+        """Статус из ChatMemberUpdated должен сразу заменять закэшированный."""
+        assert await admin_service.is_chat_admin(mock_context, -100, 1) is True
+
+        admin_service.update_member_status(-100, 1, "member")
+
+        assert await admin_service.is_chat_admin(mock_context, -100, 1) is False
+        mock_context.bot.get_chat_member.assert_awaited_once_with(-100, 1)
+
+
+def make_member(first_name: str, status: str = "member") -> MagicMock:
+    """Мок ChatMember с именем пользователя."""
+    member = MagicMock(status=status)
+    member.user.first_name = first_name
+    return member
+
+
+class TestAdminServiceMemberNames:
+    """Тесты получения имён участников чата."""
+
+    @pytest.mark.asyncio
+    async def test_names_keep_order_and_are_cached(self, admin_service):
+        """Имена возвращаются для всех id и повторно не запрашиваются."""
+        context = MagicMock()
+        context.bot.get_chat_member = AsyncMock(side_effect=lambda chat_id, uid: make_member(f"user{uid}"))
+
+        names = await admin_service.get_member_names(context, -100, [3, 1, 2])
+        assert list(names.items()) == [(3, "user3"), (1, "user1"), (2, "user2")]
+
+        assert await admin_service.get_member_name(context, -100, 1) == "user1"
+        assert context.bot.get_chat_member.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_telegram_error_gives_id_fallback(self, admin_service):
+        """Ошибка Telegram даёт "ID ..." и не кэшируется."""
+        context = MagicMock()
+        context.bot.get_chat_member = AsyncMock(side_effect=[Forbidden("Bot was kicked"), make_member("Anna")])
+
+        assert await admin_service.get_member_name(context, -100, 1) == "ID 1"
+        assert await admin_service.get_member_name(context, -100, 1) == "Anna"
+
+    @pytest.mark.asyncio
+    async def test_other_errors_are_raised(self, admin_service):
+        """Не-Telegram ошибки не превращаются в "ID ..."."""
+        context = MagicMock()
+        context.bot.get_chat_member = AsyncMock(side_effect=RuntimeError("bug"))
+
+        with pytest.raises(RuntimeError):
+            await admin_service.get_member_names(context, -100, [1])
+
+    @pytest.mark.asyncio
+    async def test_status_check_fills_name_cache(self, admin_service):
+        """Проверка прав запоминает и имя — /top не запрашивает его повторно."""
+        context = MagicMock()
+        context.bot.get_chat_member = AsyncMock(return_value=make_member("Anna", status="administrator"))
+
+        await admin_service.is_chat_admin(context, -100, 1)
+
+        assert await admin_service.get_member_name(context, -100, 1) == "Anna"
+        context.bot.get_chat_member.assert_awaited_once_with(-100, 1)
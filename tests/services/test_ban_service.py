@@ -2,8 +2,8 @@
 Тесты для BanService.
 """
 import pytest
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
-from datetime import datetime, timedelta
 
 # NOTE: Если тесты не запускаются из-за ошибки в src/config.py,
 # нужно исправить конфликт __slots__ с default values в dataclass.
@@ -98,7 +98,7 @@ class TestBanServiceGetViolationInfo:
         self, ban_service, mock_violation_repo
     ):
         """Тест: есть нарушения."""
-        ban_time = datetime.now().isoformat()
+        ban_time = int(time.time())
         mock_violation_repo.get_info.return_value = (3, ban_time)
         
         count, banned_until = await ban_service.get_violation_info(
@@ -358,7 +358,7 @@ class TestBanServiceGetRemainingTime:
         self, ban_service, mock_violation_repo
     ):
         """Тест: бан истёк."""
-        past_time = (datetime.now() - timedelta(hours=1)).isoformat()
+        past_time = int(time.time()) - 3600
         mock_violation_repo.get_info.return_value = (1, past_time)
         
         result = await ban_service.get_remaining_time(user_id=123, chat_id=456)
@@ -370,7 +370,7 @@ class TestBanServiceGetRemainingTime:
         self, ban_service, mock_violation_repo
     ):
         """Тест: активный бан."""
-        future_time = (datetime.now() + timedelta(minutes=30)).isoformat()
+        future_time = int(time.time()) + 30 * 60
         mock_violation_repo.get_info.return_value = (1, future_time)
         
         result = await ban_service.get_remaining_time(user_id=123, chat_id=456)
@@ -380,6 +380,40 @@ class TestBanServiceGetRemainingTime:
         assert 28 <= result <= 31
 
 
+class TestBanServiceGetBanStatus:
+    """Тесты метода get_ban_status()."""
+
+    @pytest.mark.asyncio
+    async def test_get_ban_status_not_banned(self, ban_service, mock_violation_repo):
+        """Тест: пользователь не забанен."""
+        mock_violation_repo.get_info.return_value = (0, None)
+
+        result = await ban_service.get_ban_status(user_id=123, chat_id=456)
+
+        assert result == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_get_ban_status_ban_expired(self, ban_service, mock_violation_repo):
+        """Тест: бан истёк."""
+        mock_violation_repo.get_info.return_value = (1, int(time.time()) - 3600)
+
+        result = await ban_service.get_ban_status(user_id=123, chat_id=456)
+
+        assert result == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_get_ban_status_active_ban_single_read(self, ban_service, mock_violation_repo):
+        """Тест: активный бан — статус и время из одного запроса."""
+        mock_violation_repo.get_info.return_value = (1, int(time.time()) + 30 * 60)
+
+        is_banned, remaining = await ban_service.get_ban_status(user_id=123, chat_id=456)
+
+        assert is_banned is True
+        assert 28 <= remaining <= 31
+        mock_violation_repo.get_info.assert_awaited_once_with(123, 456)
+        mock_violation_repo.is_banned.assert_not_called()
+
+
 class TestBanServicePermissions:
     """Тесты констант разрешений."""
     
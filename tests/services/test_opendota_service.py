@@ -10,7 +10,7 @@ from datetime import datetime
 # NOTE: Если тесты не запускаются из-за ошибки в src/config.py,
 # нужно исправить конфликт __slots__ с default values в dataclass.
 # Для Python 3.10+ используйте slots=True в декораторе @dataclass.
-from src.services.opendota_service import OpenDotaService, PlayerProfile, LiveGame, retry_with_backoff
+from src.services.opendota_service import OpenDotaService, PlayerProfile, LiveGame, retry_with_backoff, _UNAVAILABLE
 
 
 class TestSteamId64ToAccountId:
@@ -717,6 +717,23 @@ class TestOpenDotaServiceRetry:
         assert result is None
         assert call_count == 1  # Только одна попытка
         assert service.failed_requests == 0
+
+    @pytest.mark.asyncio
+    async def test_fetch_server_error_is_unavailable(self):
+        """5xx и 429 — API недоступен, а не "данных нет"."""
+        service = OpenDotaService()
+        service._check_rate_limit = AsyncMock()
+
+        for status in (429, 503):
+            mock_response = AsyncMock()
+            mock_response.status = status
+            mock_response.__aenter__ = AsyncMock(return_value=mock_response)
+            mock_response.__aexit__ = AsyncMock(return_value=None)
+            service._session = MagicMock()
+            service._session.get = MagicMock(return_value=mock_response)
+
+            assert await service._fetch_raw("/test") is _UNAVAILABLE
+            assert await service._fetch("/test") is None
     
     @pytest.mark.asyncio
     async def test_fetch_unexpected_exception_graceful_degradation(self):
@@ -809,3 +826,141 @@ class TestOpenDotaServiceRetry:
         # Rate limit должен быть проверен перед каждой попыткой
         assert rate_limit_calls == 2
         assert call_count == 2
+
+
+class TestOpenDotaServiceResponseCache:
+    """Тесты кэша ответов OpenDota API."""
+
+    @pytest.mark.asyncio
+    async def test_fetch_cached_returns_cached_response(self):
+        """Повторный запрос в пределах TTL не должен идти в API."""
+        service = OpenDotaService()
+        service._fetch_raw = AsyncMock(return_value={"data": "test"})
+
+        assert await service._fetch_cached("/test", ttl=60) == {"data": "test"}
+        assert await service._fetch_cached("/test", ttl=60) == {"data": "test"}
+
+        service._fetch_raw.assert_awaited_once_with("/test")
+
+    @pytest.mark.asyncio
+    async def test_fetch_cached_refetches_after_ttl(self):
+        """После истечения TTL ответ должен запрашиваться заново."""
+        service = OpenDotaService()
+        service._fetch_raw = AsyncMock(side_effect=[{"v": 1}, {"v": 2}])
+
+        assert await service._fetch_cached("/test", ttl=0) == {"v": 1}
+        assert await service._fetch_cached("/test", ttl=0) == {"v": 2}
+
+    @pytest.mark.asyncio
+    async def test_fetch_cached_collapses_concurrent_requests(self):
+        """Одновременные запросы одного endpoint должны сливаться в один."""
+        service = OpenDotaService()
+        call_count = 0
+
+        async def mock_fetch(endpoint):
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.01)
+            return {"data": endpoint}
+
+        service._fetch_raw = mock_fetch
+
+        results = await asyncio.gather(*(service._fetch_cached("/live", ttl=30) for _ in range(10)))
+
+        assert call_count == 1
+        assert results == [{"data": "/live"}] * 10
+        assert service._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_fetch_cached_returns_stale_on_failure(self):
+        """Если API недоступен, должен вернуться устаревший ответ из кэша."""
+        service = OpenDotaService()
+        service._fetch_raw = AsyncMock(side_effect=[{"data": "old"}, _UNAVAILABLE])
+
+        await service._fetch_cached("/test", ttl=0)
+
+        assert await service._fetch_cached("/test", ttl=0) == {"data": "old"}
+
+    @pytest.mark.asyncio
+    async def test_fetch_cached_does_not_serve_stale_on_miss(self):
+        """Ответ "данных нет" (404) не должен подменяться устаревшим."""
+        service = OpenDotaService()
+        service._fetch_raw = AsyncMock(side_effect=[{"data": "old"}, None, _UNAVAILABLE])
+
+        await service._fetch_cached("/test", ttl=0)
+
+        assert await service._fetch_cached("/test", ttl=0) is None
+        # Устаревший ответ забыт и после следующего сбоя не вернётся
+        assert await service._fetch_cached("/test", ttl=0) is None
+
+    @pytest.mark.asyncio
+    async def test_fetch_cached_response_is_read_only(self):
+        """Закэшированный ответ общий для всех, поэтому изменить его нельзя."""
+        service = OpenDotaService()
+        service._fetch_raw = AsyncMock(return_value={"players": [{"account_id": 1}]})
+
+        data = await service._fetch_cached("/test", ttl=60)
+
+        with pytest.raises(TypeError):
+            data["players"] = []
+        with pytest.raises(TypeError):
+            data["players"][0]["account_id"] = 2
+        assert await service._fetch_cached("/test", ttl=60) == {"players": ({"account_id": 1},)}
+
+    @pytest.mark.asyncio
+    async def test_fetch_cached_does_not_cache_failures(self):
+        """Неудачный ответ не должен кэшироваться."""
+        service = OpenDotaService()
+        service._fetch_raw = AsyncMock(side_effect=[None, {"data": "ok"}])
+
+        assert await service._fetch_cached("/test", ttl=60) is None
+        assert await service._fetch_cached("/test", ttl=60) == {"data": "ok"}
+
+    @pytest.mark.asyncio
+    async def test_get_wordcloud_lowercases_and_merges_words(self):
+        """get_wordcloud() должен отдавать слова в нижнем регистре и суммировать варианты."""
+        service = OpenDotaService()
+        service._fetch = AsyncMock(return_value={"my_word_counts": {"GG": 2, "gg": 3, "Noob": 1}})
+
+        assert await service.get_wordcloud(123) == {"gg": 5, "noob": 1}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_get_live_game_makes_single_request(self):
+        """Одновременные /game должны делать один запрос к /live и один к /heroes."""
+        service = OpenDotaService()
+        calls = []
+
+        async def mock_fetch(endpoint):
+            calls.append(endpoint)
+            await asyncio.sleep(0.01)
+            if endpoint == "/heroes":
+                return [{"id": 1, "localized_name": "Anti-Mage"}]
+            return [{"match_id": 42, "game_time": 600, "players": [{"account_id": 123, "hero_id": 1, "team": 0}]}]
+
+        service._fetch_raw = mock_fetch
+
+        games = await asyncio.gather(*(service.get_live_game(123) for _ in range(5)))
+
+        assert sorted(calls) == ["/heroes", "/live"]
+        assert all(game.player_hero == "Anti-Mage" for game in games)
+
+    @pytest.mark.asyncio
+    async def test_last_match_and_details_share_recent_matches(self):
+        """get_last_match() и get_match_details() должны делить кэш recentMatches."""
+        service = OpenDotaService()
+        service.HEROES = {1: "Anti-Mage"}
+        calls = []
+
+        async def mock_fetch(endpoint):
+            calls.append(endpoint)
+            if endpoint.endswith("/recentMatches"):
+                return [{"match_id": 42, "hero_id": 1, "player_slot": 0, "radiant_win": True}]
+            return {"radiant_win": True, "players": [{"account_id": 123, "hero_id": 1, "player_slot": 0}]}
+
+        service._fetch_raw = mock_fetch
+
+        await service.get_last_match(123)
+        details = await service.get_match_details(123)
+
+        assert calls == ["/players/123/recentMatches", "/matches/42"]
+        assert details["match_id"] == 42